@@ -1,15 +1,142 @@
-from PyQt6.QtWidgets import QGraphicsScene, QGraphicsView, QInputDialog, QMessageBox, QGraphicsLineItem, QGraphicsPolygonItem
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPainter, QPen, QBrush, QColor
+from PyQt6.QtWidgets import QGraphicsScene, QGraphicsView, QGraphicsItem, QInputDialog, QMessageBox, QGraphicsLineItem, QGraphicsPathItem
+from PyQt6.QtWidgets import QGraphicsPixmapItem, QGraphicsEllipseItem, QGraphicsSimpleTextItem, QStyleOptionGraphicsItem
+from PyQt6.QtCore import Qt, QRectF, QSizeF, QBuffer, QMarginsF
+from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QPainterPath, QPixmap, QImage, QTransform
+from PyQt6.QtGui import QPdfWriter, QPageLayout, QPageSize
 from PyQt6 import QtCore
 from models.smoke_detector import SmokeDetector, IOBox, CallPoint
+from models.range_overlay import RangeOverlayItem
 from views.floor_plan_view import FloorPlanView
-import json
-from pathlib import Path
 from PyQt6.QtCore import QPointF
-from PyQt6.QtCore import QTimer
-import base64
+from PyQt6.QtCore import QTimer, QCoreApplication
 import math
+import os
+import re
+import time
+from pathlib import Path
+from collections import Counter, defaultdict
+
+_b64_funcs = None
+
+
+def _b64_codec():
+    """Return (encode, decode), importing the base64 codec on first use.
+
+    Only projects with an embedded floor plan need it, so it is not loaded
+    at import time. pybase64 (SIMD) is preferred when installed.
+    """
+    global _b64_funcs
+    if _b64_funcs is None:
+        try:
+            import pybase64 as _b64
+        except ImportError:
+            import base64 as _b64
+        _b64_funcs = (_b64.b64encode, _b64.b64decode)
+    return _b64_funcs
+
+
+# Decimal number literal (optionally signed, fraction and exponent); vetted
+# before float() so non-numeric text never raises
+_FLOAT_RE = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+
+
+def _parse_key(raw, allow_float=False):
+    """Normalize a bus/group/address field: int when it parses ('01' -> 1),
+    float too with `allow_float`, else the stripped string ('' when unset).
+
+    Values are checked before conversion instead of catching ValueError, as
+    fields are often empty or text while being edited.
+    """
+    text = str(raw or '').strip()
+    digits = text[1:] if text[:1] in '+-' else text
+    if digits.isdecimal():
+        return int(text)
+    if allow_float and _FLOAT_RE.fullmatch(text):
+        return float(text)
+    return text
+
+
+def _detector_keys(d):
+    """Return the parsed (bus, group, address) keys of device `d`.
+
+    The result is cached on the device together with the raw field values it
+    was parsed from, so editing a field simply misses the cache; nothing has
+    to invalidate it.
+    """
+    raw = (d.bus_number, d.group, d.address)
+    cached = getattr(d, '_address_keys', None)
+    if cached is not None and cached[0] == raw:
+        return cached[1]
+    keys = (_parse_key(raw[0]), _parse_key(raw[1]), _parse_key(raw[2], allow_float=True))
+    d._address_keys = (raw, keys)
+    return keys
+
+
+def _address_sort_key(d):
+    """Sort key ordering devices by numeric address first, then by address text."""
+    addr = _detector_keys(d)[2]
+    if isinstance(addr, str):
+        return (1, 0, addr)
+    return (0, addr, '')
+
+
+def _sort_keys(keys):
+    """Return NumPy sort keys (num, text) for parsed keys from _parse_key.
+
+    Numbers get their value in `num` and 0 in `text`; strings get num=inf and
+    their rank among the strings in `text`, so numbers sort first, by value,
+    then the rest lexicographically. Equal key pairs mean equal values.
+    """
+    import numpy as np
+
+    num = np.full(len(keys), np.inf)
+    text = np.zeros(len(keys), dtype=np.int64)
+    other = {}
+    for k, v in enumerate(keys):
+        if isinstance(v, str):
+            other.setdefault(v, []).append(k)
+        else:
+            num[k] = v
+    for rank, v in enumerate(sorted(other), 1):
+        text[other[v]] = rank
+    return num, text
+
+
+# Device classes by the device_type string used in projects and the UI
+_DEVICE_CTORS = {"Detector": SmokeDetector, "IO": IOBox, "CallPoint": CallPoint}
+
+# Resolution used to rasterize the floor plan page in PDF exports
+EXPORT_DPI = 200
+
+# Device resolution of Qt's PDF engine for the vector plan page; coordinates
+# are rounded to this grid
+PLAN_PDF_RESOLUTION = 1200
+
+# From this many devices the view repaints the whole viewport: tracking many
+# small dirty regions then costs more than the redraw (the floor plan is cached)
+FULL_VIEWPORT_MIN_DEVICES = 500
+
+# Embedded floor plans larger than this are downscaled (long edge capped at
+# FLOORPLAN_BLOB_MAX_EDGE pixels) before they are written into a project
+FLOORPLAN_BLOB_MAX_BYTES = 2 * 1024 * 1024
+FLOORPLAN_BLOB_MAX_EDGE = 3000
+
+# Shared pens/brushes; reused for every detector instead of allocated per call
+_BRUSH_GREEN = QBrush(QColor(0, 200, 0))
+_BRUSH_ORANGE = QBrush(QColor(255, 140, 0))
+_BRUSH_HL = QBrush(QColor(255, 255, 0))
+_PEN_LINE = QPen(Qt.GlobalColor.black)
+_PEN_LINE.setWidth(2)
+_PEN_HL = QPen(QColor(0, 0, 0))
+_PEN_HL.setWidth(3)
+_PEN_NONE = QPen(Qt.PenStyle.NoPen)
+# Measure tool: red dots, line and label
+_BRUSH_MEASURE = QBrush(QColor(200, 30, 30))
+_PEN_MEASURE = QPen(QColor(200, 30, 30))
+_PEN_MEASURE.setWidth(2)
+_PEN_ARROW = QPen(QColor(80, 80, 80))
+_PEN_ARROW.setWidth(3)
+_BRUSH_ARROW = QBrush(QColor(80, 80, 80))
 
 class FloorPlanController:
     def __init__(self, parent):
@@ -21,12 +148,40 @@ class FloorPlanController:
         except Exception:
             pass
         self.detectors = []
-        self.lines = []  # list of {'item': QGraphicsLineItem, 'start': detector, 'end': detector}
+        self.lines = []  # list of {'start': detector, 'end': detector}
         self._line_start = None
+        # All manual lines are drawn by one path item instead of one item per line
+        self._lines_path = QPainterPath()
+        self._lines_path_item = QGraphicsPathItem()
+        self._lines_path_item.setPen(_PEN_LINE)
+        self._lines_path_item.setZValue(1)
+        self._lines_path_item.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+        self.scene.addItem(self._lines_path_item)
         self.scale = 1.0  # meters per pixel
+        # Scene pixels per pixel of floorplan_blob (> 1 for a downscaled blob loaded from a project)
+        self.floorplan_blob_scale = 1.0
+        # (blob, scale, result) of the last _compact_floorplan_blob() call
+        self._compact_blob_cache = None
+        # The floor plan's pixmap item, tracked so reloading never scans the scene
+        self.floor_plan_item = None
+        # [(fingerprint, PDF bytes)] of recent vector plan renders (see _render_plan_pdf)
+        self._plan_pdf_cache = []
+        # ((path, page), future) of a PDF page being rasterized ahead of load_floor_plan
+        self._pdf_prefetch = None
+        # Process pool running those renders; started on the first prefetch
+        self._pdf_executor = None
         self.parent = parent
         # Whether detector range circles should be visible
         self.show_ranges = False
+        # Pending highlight restores (detector -> (brush, pen, expiry)) served by one timer
+        self._hl_pending = {}
+        self._hl_timer = QTimer(self.view)
+        self._hl_timer.setInterval(50)
+        self._hl_timer.timeout.connect(self._hl_tick)
+        # All range circles are painted by one overlay item
+        self._range_overlay = RangeOverlayItem(self)
+        self._range_overlay.setVisible(False)
+        self.scene.addItem(self._range_overlay)
         self._calibrating = False
         self._calibration_points = []
         
@@ -34,8 +189,23 @@ class FloorPlanController:
         self._device_type_to_add = "Detector"
         # Whether auto-drawn address arrows should be visible
         self.show_arrows = False
-        # Internal list of auto-created arrow items (dicts with 'line' and 'head')
-        self._auto_arrows = []
+        # All auto-drawn arrows are one path item (shafts) with a child path item
+        # (filled heads); hiding the parent hides both
+        self._auto_arrow_item = QGraphicsPathItem()
+        self._auto_arrow_item.setPen(_PEN_ARROW)
+        self._auto_arrow_item.setZValue(0.5)
+        self._auto_arrow_item.setVisible(False)
+        self._auto_arrow_heads = QGraphicsPathItem(self._auto_arrow_item)
+        self._auto_arrow_heads.setPen(_PEN_NONE)
+        self._auto_arrow_heads.setBrush(_BRUSH_ARROW)
+        self.scene.addItem(self._auto_arrow_item)
+        # True when the arrow paths are out of date (rebuilds are skipped while hidden)
+        self._arrows_stale = True
+        # Coalesces the rebuilds requested by every step of a drag into one per event-loop pass
+        self._arrow_timer = QTimer(self.view)
+        self._arrow_timer.setSingleShot(True)
+        self._arrow_timer.setInterval(0)
+        self._arrow_timer.timeout.connect(self.update_address_arrows)
         # Auto-addressing state for sequential placement
         self._auto_address_enabled = False
         self._auto_bus_raw = None
@@ -45,6 +215,18 @@ class FloorPlanController:
         # Show a small scale legend in the top-right when True
         self.show_scale_legend = False
 
+        # True while from_dict recreates items; defers per-item recoloring
+        self._bulk_loading = False
+        # True while ranges are reapplied in bulk; the overlay refreshes once afterwards
+        self._ranges_deferred = False
+        # Serial-number occurrence counts, maintained incrementally on add/remove
+        self._sn_counts = {}
+        self._sn_to_detectors = defaultdict(list)
+        # find_detectors index (see _search_index); None when stale
+        self._search_idx = None
+        # (bus, group) keys -> highest integer address (see _address_max_index); None when stale
+        self._addr_max_by_bg = None
+
         # Measure tool state
         self._measuring = False
         self._measure_points = []  # list of QPointF
@@ -55,7 +237,9 @@ class FloorPlanController:
             self.view.measure_point_requested.connect(self._on_measure_point)
         except Exception:
             pass
-        self.view.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+        # Small projects only repaint dirty regions; see _tune_viewport_update_mode
+        self._tune_viewport_update_mode()
+        self.view.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing, True)
         self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
         self.view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
         self.view.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
@@ -75,10 +259,6 @@ class FloorPlanController:
             image_path: Path to image file, PDF file, or raw image bytes
             pdf_page: If image_path is a PDF, the page number to load (0-based)
         """
-        from PyQt6.QtGui import QPixmap
-        from PyQt6.QtWidgets import QGraphicsPixmapItem
-        from pathlib import Path
-
         pix = QPixmap()
         
         # Handle different input types
@@ -91,41 +271,59 @@ class FloorPlanController:
             self.floorplan_blob = bytes(image_path)
             self.pdf_page = None
         else:
-            # Path-like input - check for PDF
-            path = Path(str(image_path))
-            if path.suffix.lower() == '.pdf':
-                # Convert PDF page to PNG
+            # Path-like input - check for PDF (string ops; no Path object needed)
+            sp = str(image_path)
+            if os.path.splitext(sp)[1].lower() == '.pdf':
+                # Convert PDF page to PNG (picking up a prefetched render if there is one)
+                self._take_pdf_prefetch(sp, pdf_page or 0)
                 from utils import pdf_tools
-                png_data = pdf_tools.pdf_page_to_pixmap(str(path), pdf_page or 0)
+                try:
+                    png_data = pdf_tools.pdf_page_to_pixmap_cached(sp, pdf_page or 0)
+                finally:
+                    pdf_tools.close_cached()
                 if not pix.loadFromData(png_data):
-                    raise ValueError(f"Failed to convert PDF page to image: {image_path}")
-                self.floorplan_path = str(image_path)
+                    raise ValueError(f"Failed to convert PDF page to image: {sp}")
+                self.floorplan_path = sp
                 self.floorplan_blob = png_data
                 self.pdf_page = pdf_page
             else:
-                # Regular image file - store its content for portability
-                pix = QPixmap(str(image_path))
-                if pix.isNull():
-                    raise ValueError(f"Could not load image: {image_path}")
-                # Save the image data to ensure project portability
-                ba = QtCore.QByteArray()
-                buffer = QtCore.QBuffer(ba)
-                buffer.open(QtCore.QBuffer.OpenModeFlag.WriteOnly)
-                pix.save(buffer, "PNG")
-                self.floorplan_blob = bytes(ba.data())
-                self.floorplan_path = str(image_path)
+                # Keep the original file bytes as the portability blob whenever Qt
+                # can decode them as-is (it sniffs the format from the content), so
+                # projects reopen from the same bytes without a PNG re-encode
+                with open(sp, 'rb') as f:
+                    blob = f.read()
+                if not pix.loadFromData(blob):
+                    # Formats Qt only recognises by file name: decode from the path
+                    # and store a PNG copy that loadFromData can read back
+                    pix = QPixmap(sp)
+                    if pix.isNull():
+                        raise ValueError(f"Could not load image: {sp}")
+                    ba = QtCore.QByteArray()
+                    buffer = QtCore.QBuffer(ba)
+                    buffer.open(QtCore.QBuffer.OpenModeFlag.WriteOnly)
+                    pix.save(buffer, "PNG")
+                    blob = bytes(ba.data())
+                self.floorplan_blob = blob
+                self.floorplan_path = sp
                 self.pdf_page = None
 
-        # Remove any existing floor plan items
-        for item in list(self.scene.items()):
-            # Keep detector items (they are SmokeDetector instances) but remove pixmaps
-            from PyQt6.QtWidgets import QGraphicsPixmapItem as _GPI
-            if isinstance(item, _GPI):
-                self.scene.removeItem(item)
+        self.floorplan_blob_scale = 1.0
+        self._compact_blob_cache = None
+
+        # Remove the existing floor plan item (detector icons are pixmap items too,
+        # so remove it by reference rather than by type)
+        old = self.floor_plan_item
+        if old is not None:
+            try:
+                self.scene.removeItem(old)
+            except Exception:
+                pass
 
         self.floor_plan_item = QGraphicsPixmapItem(pix)
         # Place the floor plan at the origin
         self.floor_plan_item.setZValue(-10)
+        # Keep the rasterized plan cached so detector redraws don't repaint it
+        self.floor_plan_item.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
         self.scene.addItem(self.floor_plan_item)
         # Fit view to the image bounds if view is available
         try:
@@ -133,8 +331,125 @@ class FloorPlanController:
         except Exception:
             pass
 
-    def to_dict(self):
-        """Serialize the current project state to a dictionary."""
+    def prefetch_pdf_page(self, pdf_path, pdf_page=None):
+        """Start rasterizing a PDF page before load_floor_plan asks for it.
+
+        The render runs in a separate process so the UI stays responsive while
+        the user answers the remaining new-project dialogs; PyMuPDF holds the
+        GIL while rendering, so a worker thread would freeze the UI just the
+        same. load_floor_plan() waits for the result when called with the same
+        path and page; it then lands in pdf_tools' render cache.
+        """
+        from utils import pdf_tools
+
+        self.cancel_pdf_prefetch()
+        key = (str(pdf_path), pdf_page or 0)
+        try:
+            future = self._pdf_worker().submit(pdf_tools.pdf_page_to_pixmap_detached, *key)
+        except Exception:
+            return
+        self._pdf_prefetch = (key, future)
+
+    def _pdf_worker(self):
+        """Return the render process pool, started on first use and kept for later prefetches."""
+        if self._pdf_executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn, as in utils.pdf_export: forking a process running Qt threads can deadlock
+            self._pdf_executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+            try:
+                QCoreApplication.instance().aboutToQuit.connect(self.shutdown_pdf_worker)
+            except Exception:
+                pass
+        return self._pdf_executor
+
+    def shutdown_pdf_worker(self):
+        """Stop the prefetch render process, if it was started."""
+        self.cancel_pdf_prefetch()
+        executor, self._pdf_executor = self._pdf_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def cancel_pdf_prefetch(self):
+        """Drop a pending prefetch_pdf_page() render, if any."""
+        pending, self._pdf_prefetch = self._pdf_prefetch, None
+        if pending is not None:
+            pending[1].cancel()
+
+    def _take_pdf_prefetch(self, pdf_path, pdf_page):
+        """Wait for a prefetch of (pdf_path, pdf_page) and add it to the render cache.
+
+        Any other pending prefetch is dropped.
+        """
+        pending, self._pdf_prefetch = self._pdf_prefetch, None
+        if pending is None:
+            return
+        key, future = pending
+        if key != (pdf_path, pdf_page):
+            future.cancel()
+            return
+        try:
+            from utils import pdf_tools
+            pdf_tools.store_pixmap_cached(pdf_path, pdf_page, future.result())
+        except Exception:
+            # load_floor_plan renders in-process instead
+            pass
+
+    def _compact_floorplan_blob(self):
+        """Return (blob, scale): the floor plan image to store in a project.
+
+        Blobs over FLOORPLAN_BLOB_MAX_BYTES whose long edge exceeds
+        FLOORPLAN_BLOB_MAX_EDGE are resampled to that edge (JPEG stays JPEG,
+        anything else becomes PNG); `scale` is then floorplan_blob_scale times
+        the reduction. The smaller copy is used only if it is smaller, and
+        floorplan_blob itself is never replaced. The result is kept until the
+        floor plan changes, so repeated saves resample once.
+        """
+        blob = self.floorplan_blob
+        scale = self.floorplan_blob_scale
+        cached = self._compact_blob_cache
+        if cached is not None and cached[0] is blob and cached[1] == scale:
+            return cached[2]
+        result = (blob, scale)
+        if len(blob) > FLOORPLAN_BLOB_MAX_BYTES:
+            try:
+                image = QImage()
+                if image.loadFromData(blob) and max(image.width(), image.height()) > FLOORPLAN_BLOB_MAX_EDGE:
+                    small = image.scaled(FLOORPLAN_BLOB_MAX_EDGE, FLOORPLAN_BLOB_MAX_EDGE,
+                                         Qt.AspectRatioMode.KeepAspectRatio,
+                                         Qt.TransformationMode.SmoothTransformation)
+                    ba = QtCore.QByteArray()
+                    buffer = QtCore.QBuffer(ba)
+                    buffer.open(QtCore.QBuffer.OpenModeFlag.WriteOnly)
+                    if blob[:3] == b'\xff\xd8\xff':
+                        small.save(buffer, "JPG", 90)
+                    else:
+                        small.save(buffer, "PNG")
+                    buffer.close()
+                    out = bytes(ba.data())
+                    if 0 < len(out) < len(blob):
+                        result = (out, scale * image.width() / small.width())
+            except Exception:
+                pass
+        self._compact_blob_cache = (blob, scale, result)
+        return result
+
+    def floorplan_blob_for_save(self):
+        """Return the floor plan bytes a project should store, or None without a floor plan.
+
+        Matches the `floorplan_scale_hint` written by to_dict().
+        """
+        if not getattr(self, 'floorplan_blob', None):
+            return None
+        return self._compact_floorplan_blob()[0]
+
+    def to_dict(self, embed_blob=True):
+        """Serialize the current project state to a dictionary.
+
+        Args:
+            embed_blob: store the floor plan image base64-encoded in the dict;
+                pass False when the caller saves floorplan_blob_for_save() itself
+        """
         data = {
             "floorplan_path": getattr(self, 'floorplan_path', None),
             "floorplan_blob": None,
@@ -147,46 +462,89 @@ class FloorPlanController:
 
         # Always include the image blob if we have one (ensures project portability)
         if getattr(self, 'floorplan_blob', None):
-            data['floorplan_blob'] = base64.b64encode(self.floorplan_blob).decode('ascii')
+            blob, blob_scale = self._compact_floorplan_blob()
+            if embed_blob:
+                b64encode, _ = _b64_codec()
+                data['floorplan_blob'] = b64encode(blob).decode('ascii')
             data['floorplan_name'] = Path(getattr(self, 'floorplan_path', '') or '').name or None
+            if blob_scale != 1.0:
+                # from_dict scales the smaller image back up to the same scene size
+                data['floorplan_scale_hint'] = blob_scale
             
         # Include original path for reference
         data['floorplan_path'] = getattr(self, 'floorplan_path', None)
 
-        # Collect detectors
+        # Collect detectors; shared fields have class-level defaults on BaseDevice,
+        # only detectors carry a range and paired serial
+        detectors_out = data["detectors"]
         for d in self.detectors:
             pos = d.pos()
-            data["detectors"].append({
+            detectors_out.append({
                 "x": pos.x(),
                 "y": pos.y(),
-                "model": getattr(d, 'model', ''),
+                "model": d.model,
                 "range": getattr(d, 'range', 0),
-                "bus_number": getattr(d, 'bus_number', ''),
-                "group": getattr(d, 'group', ''),
-                "address": getattr(d, 'address', ''),
-                "full_address_label": getattr(d, 'get_full_address_label', lambda: '')(),
-                "serial_number": getattr(d, 'serial_number', ''),
-                "room_id": getattr(d, 'room_id', ''),
-                "qr_data": getattr(d, 'qr_data', ''),
-                "brand": getattr(d, 'brand', ''),
+                "bus_number": d.bus_number,
+                "group": d.group,
+                "address": d.address,
+                "full_address_label": d.get_full_address_label(),
+                "serial_number": d.serial_number,
+                "room_id": d.room_id,
+                "qr_data": d.qr_data,
+                "brand": d.brand,
                 "paired_sn": getattr(d, 'paired_sn', ''),
-                "device_type": getattr(d, 'device_type', 'Detector'),
+                "device_type": d.device_type,
             })
 
         # Include the stored floorplan path if available
         # Serialize lines as detector index pairs
+        idx_map = {id(d): i for i, d in enumerate(self.detectors)}
         for ln in self.lines:
-            try:
-                s = self.detectors.index(ln['start'])
-                e = self.detectors.index(ln['end'])
-                data['lines'].append([s, e])
-            except Exception:
+            s = idx_map.get(id(ln.get('start')))
+            e = idx_map.get(id(ln.get('end')))
+            if s is None or e is None:
                 continue
+            data['lines'].append([s, e])
 
         return data
 
-    def from_dict(self, data: dict):
-        """Load project state from a dictionary (reverse of to_dict)."""
+    def from_dict(self, data: dict, blob=None):
+        """Load project state from a dictionary (reverse of to_dict).
+
+        Args:
+            data: project dictionary
+            blob: floor plan image bytes stored outside `data`; when None an
+                embedded base64 `floorplan_blob` is used instead
+        """
+        # Bulk load: skip per-item scene indexing, signals and recoloring until the end
+        prev_index_method = self.scene.itemIndexMethod()
+        self.scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+        self.scene.blockSignals(True)
+        # No intermediate repaints while items are recreated; one update at the end
+        self.view.setUpdatesEnabled(False)
+        self._bulk_loading = True
+        try:
+            self._load_project_items(data, blob)
+        finally:
+            self._bulk_loading = False
+            self.scene.blockSignals(False)
+            self.scene.setItemIndexMethod(prev_index_method)
+            self.view.setUpdatesEnabled(True)
+            # Lines are not drawn one by one while bulk loading; this also
+            # renumbers their path elements if the load stopped half way
+            self._rebuild_lines_path()
+
+        # Update colors based on serial uniqueness
+        try:
+            self.update_detector_colors()
+        except Exception:
+            pass
+        self.refresh_range_overlay()
+        self._tune_viewport_update_mode()
+        self.view.viewport().update()
+
+    def _load_project_items(self, data: dict, blob=None):
+        """Recreate the floor plan, detectors and lines from `data` (used by from_dict)."""
         # Clear existing detectors
         for d in list(self.detectors):
             try:
@@ -195,15 +553,31 @@ class FloorPlanController:
                 pass
 
         # Load floorplan
-        # If we have an embedded image blob, use it directly
-        if data.get('floorplan_blob'):
+        # If we have an image blob (passed in, or embedded by older saves), use it directly
+        if blob or data.get('floorplan_blob'):
             try:
-                blob = base64.b64decode(data['floorplan_blob'])
+                if not blob:
+                    _, b64decode = _b64_codec()
+                    try:
+                        # Strict decoding is pybase64's fast path; to_dict never writes line breaks
+                        blob = b64decode(data['floorplan_blob'], validate=True)
+                    except ValueError:
+                        # Tolerate whitespace in hand-edited or foreign project files
+                        blob = b64decode(data['floorplan_blob'])
                 # Keep original path for reference
                 self.floorplan_path = data.get('floorplan_path')
                 try:
                     # Load the blob with PDF page if specified
                     self.load_floor_plan(blob, data.get('pdf_page'))
+                    hint = float(data.get('floorplan_scale_hint') or 1.0)
+                    if hint > 0 and hint != 1.0:
+                        # Downscaled blob: stretch it back over the original scene area
+                        self.floor_plan_item.setScale(hint)
+                        self.floorplan_blob_scale = hint
+                        try:
+                            self.view.fitInView(self.floor_plan_item, Qt.AspectRatioMode.KeepAspectRatio)
+                        except Exception:
+                            pass
                 except Exception:
                     # Just store the blob if loading fails
                     self.floorplan_blob = blob
@@ -272,12 +646,6 @@ class FloorPlanController:
             except Exception:
                 continue
 
-        # Update colors based on serial uniqueness
-        try:
-            self.update_detector_colors()
-        except Exception:
-            pass
-
     def validate_project(self):
         """Validate project for common errors prior to export.
 
@@ -286,53 +654,53 @@ class FloorPlanController:
         errors = []
         warnings = []
 
+        # One structure-of-arrays snapshot; no Qt calls in the checks below
+        arrays = self.detector_arrays(with_labels=True)
+        pos = arrays['pos']
+        serials = [sn.strip() for sn in arrays['serial_number']]
+        labels = arrays['label']
+
+        def _at(idx):
+            return f"@{pos[idx, 0]:.0f},{pos[idx, 1]:.0f}"
+
+        def _name(idx):
+            return labels[idx] or _at(idx)
+
+        def _duplicates(values):
+            # value -> indices, only for non-empty values that occur more than once
+            counts = Counter(values)
+            counts.pop('', None)
+            if len(counts) == len(values):
+                # all distinct and non-empty (the usual case): no second pass
+                return {}
+            dups = {}
+            for idx, v in enumerate(values):
+                if counts.get(v, 0) > 1:
+                    dups.setdefault(v, []).append(idx)
+            return dups
+
         # Missing serial numbers
-        missing_serial = [d for d in self.detectors if not (getattr(d, 'serial_number', '') or '').strip()]
+        missing_serial = serials.count('')
         if missing_serial:
-            errors.append(f"{len(missing_serial)} detector(s) missing serial number(s).")
+            errors.append(f"{missing_serial} detector(s) missing serial number(s).")
 
         # Duplicate serial numbers
-        sn_map = {}
-        for d in self.detectors:
-            sn = (getattr(d, 'serial_number', '') or '').strip()
-            if sn:
-                sn_map.setdefault(sn, []).append(d)
-        dup_sns = {sn: items for sn, items in sn_map.items() if len(items) > 1}
-        if dup_sns:
-            for sn, items in dup_sns.items():
-                labels = [getattr(i, 'get_full_address_label', lambda: '')() or f"@{i.pos().x():.0f},{i.pos().y():.0f}" for i in items]
-                errors.append(f"Duplicate serial '{sn}' found on detectors: {', '.join(labels)}")
+        for sn, items in _duplicates(serials).items():
+            errors.append(f"Duplicate serial '{sn}' found on detectors: {', '.join(_name(i) for i in items)}")
 
         # Duplicate address labels
-        addr_map = {}
-        for d in self.detectors:
-            lbl = ''
-            try:
-                lbl = d.get_full_address_label()
-            except Exception:
-                lbl = ''
-            if lbl:
-                addr_map.setdefault(lbl, []).append(d)
-        dup_addrs = {lbl: items for lbl, items in addr_map.items() if len(items) > 1}
-        if dup_addrs:
-            for lbl, items in dup_addrs.items():
-                poslist = [f"@{i.pos().x():.0f},{i.pos().y():.0f}" for i in items]
-                errors.append(f"Duplicate address label '{lbl}' on detectors at: {', '.join(poslist)}")
+        for lbl, items in _duplicates(labels).items():
+            poslist = [_at(i) for i in items]
+            errors.append(f"Duplicate address label '{lbl}' on detectors at: {', '.join(poslist)}")
 
         # Spacing check (requires numeric self.scale which is meters-per-pixel)
         if isinstance(self.scale, (int, float)) and float(self.scale) > 0:
-            for i in range(len(self.detectors)):
-                for j in range(i + 1, len(self.detectors)):
-                    a = self.detectors[i]
-                    b = self.detectors[j]
-                    dx = a.pos().x() - b.pos().x()
-                    dy = a.pos().y() - b.pos().y()
-                    pix = math.hypot(dx, dy)
-                    meters = pix * float(self.scale)
-                    if meters < 0.5:
-                        la = getattr(a, 'get_full_address_label', lambda: '')() or f"@{a.pos().x():.0f},{a.pos().y():.0f}"
-                        lb = getattr(b, 'get_full_address_label', lambda: '')() or f"@{b.pos().x():.0f},{b.pos().y():.0f}"
-                        errors.append(f"Detectors too close (<0.5m): {la} and {lb} (distance {meters:.2f} m)")
+            from utils import geometry
+
+            close_i, close_j = geometry.close_pairs(pos[:, 0], pos[:, 1], float(self.scale), 0.5)
+            dists = geometry.pairwise_hypot(pos[close_i], pos[close_j]) * float(self.scale)
+            for i, j, meters in zip(close_i.tolist(), close_j.tolist(), dists.tolist()):
+                errors.append(f"Detectors too close (<0.5m): {_name(i)} and {_name(j)} (distance {meters:.2f} m)")
         else:
             warnings.append("Project scale is not a numeric meters-per-pixel value; spacing checks were skipped. Calibrate project to enable spacing validation.")
 
@@ -345,16 +713,12 @@ class FloorPlanController:
             pos: QPointF position
             device_type: "Detector", "IO", or "CallPoint"
         """
-        if device_type == "IO":
-            device = IOBox(pos, controller=self)
-        elif device_type == "CallPoint":
-            device = CallPoint(pos, controller=self)
-        else:
-            # Default to smoke detector
-            device = SmokeDetector(pos, controller=self)
+        # Unknown types default to a smoke detector
+        device = _DEVICE_CTORS.get(device_type, SmokeDetector)(pos, controller=self)
 
         # If auto-addressing is enabled and we're adding detectors, populate
         # bus/group/address automatically and increment the next address.
+        auto_addressed = False
         try:
             if device_type == "Detector" and getattr(self, '_auto_address_enabled', False):
                 # Use raw values as stored from the dialog; address is numeric next
@@ -373,6 +737,7 @@ class FloorPlanController:
                         # initialize by scanning
                         self.start_auto_address(self._auto_bus_raw, self._auto_group_raw)
                     device.address = str(self._next_address)
+                    auto_addressed = True
                     # increment for next placement
                     try:
                         self._next_address = int(self._next_address) + 1
@@ -385,42 +750,150 @@ class FloorPlanController:
             pass
         
         self.detectors.append(device)
+        self._search_idx = None
+        if auto_addressed and self._addr_max_by_bg is not None:
+            self._note_address(self._addr_max_by_bg, device)
+        else:
+            # callers set the fields of other devices after adding them
+            self._addr_max_by_bg = None
         self.scene.addItem(device)
-        # update coloring for serial uniqueness
+        # update coloring for serial uniqueness (deferred while bulk loading)
+        if not self._bulk_loading:
+            self._tune_viewport_update_mode()
+            try:
+                self._on_serial_added(device, getattr(device, 'serial_number', '') or '')
+            except Exception:
+                pass
+            try:
+                self.update_address_arrows()
+            except Exception:
+                pass
+        return device
+
+    def detector_arrays(self, with_labels=False):
+        """Return a structure-of-arrays snapshot of the devices, indexed like self.detectors.
+
+        Reads every device once: 'pos' is an (N, 2) float64 NumPy array of
+        scene positions and 'serial_number', 'bus_number', 'group', 'address',
+        'room_id' and 'device_type' are lists of strings ('' when unset).
+        With `with_labels`, 'label' holds the full address labels as well.
+        Callers can then filter and group with list or NumPy operations
+        instead of calling into each item.
+        """
+        import numpy as np
+
+        xy = []
+        sns, buses, groups, addrs, rooms, dtypes = [], [], [], [], [], []
+        labels = [] if with_labels else None
+        for d in self.detectors:
+            p = d.pos()
+            xy.append((p.x(), p.y()))
+            sns.append(d.serial_number or '')
+            buses.append(d.bus_number or '')
+            groups.append(d.group or '')
+            addrs.append(d.address or '')
+            rooms.append(d.room_id or '')
+            dtypes.append(d.device_type or '')
+            if labels is not None:
+                try:
+                    labels.append(d.get_full_address_label() or '')
+                except Exception:
+                    labels.append('')
+        arrays = {
+            'pos': np.array(xy, dtype=np.float64).reshape(-1, 2),
+            'serial_number': sns,
+            'bus_number': buses,
+            'group': groups,
+            'address': addrs,
+            'room_id': rooms,
+            'device_type': dtypes,
+        }
+        if labels is not None:
+            arrays['label'] = labels
+        return arrays
+
+    def _tune_viewport_update_mode(self):
+        """Pick the view's repaint strategy for the current device count.
+
+        Below FULL_VIEWPORT_MIN_DEVICES only the dirty regions are repainted, so
+        dragging one detector does not redraw the whole floor plan; larger
+        projects repaint the full viewport.
+        """
+        modes = QGraphicsView.ViewportUpdateMode
+        if len(self.detectors) >= FULL_VIEWPORT_MIN_DEVICES:
+            mode = modes.FullViewportUpdate
+        else:
+            mode = modes.SmartViewportUpdate
         try:
-            self.update_detector_colors()
+            if self.view.viewportUpdateMode() != mode:
+                self.view.setViewportUpdateMode(mode)
         except Exception:
             pass
-        return device
 
     def find_detectors(self, query):
         """Find detectors matching a serial number, full address label, or containing the query.
 
+        Every detector whose serial, label or room contains the query (ignoring
+        case) is returned; exact serial or full-label matches come first.
         Returns a list of detector objects (may be empty).
         """
         q = (str(query) or '').strip()
         if not q:
             return []
         ql = q.lower()
-        results = []
-        for d in self.detectors:
-            try:
-                sn = (getattr(d, 'serial_number', '') or '')
-                full = ''
+        exact, rows = self._search_index()
+        hits = exact.get(q, [])
+        first = {id(d) for d in hits}
+        return list(hits) + [d for d, sn_l, full_l, room_l in rows
+                             if id(d) not in first and (ql in sn_l or ql in full_l or ql in room_l)]
+
+    def _search_index(self):
+        """Return (exact, rows) used by find_detectors, building them on first use.
+
+        `exact` maps serials and full labels to their detectors;
+        `rows` holds (detector, serial, label, room) with lowercase strings.
+        Dropped by add/remove and invalidate_search_cache().
+        """
+        index = self._search_idx
+        if index is None:
+            exact = defaultdict(list)
+            rows = []
+            for d in self.detectors:
                 try:
-                    full = d.get_full_address_label() or ''
+                    cache = d._search_cache
+                    if cache is None:
+                        cache = self._build_search_cache(d)
                 except Exception:
-                    full = ''
-                room = (getattr(d, 'room_id', '') or '')
-
-                if q == sn or q == full:
-                    results.append(d)
                     continue
-                if ql in sn.lower() or ql in full.lower() or ql in room.lower():
-                    results.append(d)
-            except Exception:
-                continue
-        return results
+                sn, full = cache[:2]
+                rows.append((d, *cache[2:]))
+                if sn:
+                    exact[sn].append(d)
+                if full and full != sn:
+                    exact[full].append(d)
+            index = self._search_idx = (exact, rows)
+        return index
+
+    def _build_search_cache(self, detector):
+        """Compute and store the (serial, full label, and lowercase serial, label, room) tuple used by find_detectors."""
+        sn = getattr(detector, 'serial_number', '') or ''
+        try:
+            full = detector.get_full_address_label() or ''
+        except Exception:
+            full = ''
+        room = getattr(detector, 'room_id', '') or ''
+        cache = (sn, full, sn.lower(), full.lower(), room.lower())
+        detector._search_cache = cache
+        return cache
+
+    def invalidate_search_cache(self, detector):
+        """Drop the cached search strings of `detector`; call after editing its fields."""
+        self._search_idx = None
+        self._addr_max_by_bg = None
+        try:
+            detector._search_cache = None
+        except Exception:
+            pass
 
     def highlight_detector(self, detector, duration_ms=1500):
         """Center on and temporarily highlight a detector.
@@ -443,41 +916,119 @@ class FloorPlanController:
 
             # temporarily change brush and pen for highlight
             try:
-                orig_brush = detector.brush()
-                orig_pen = detector.pen()
-                
-                # Set bright yellow background with thick black outline
-                detector.setBrush(QBrush(QColor(255, 255, 0)))
-                highlight_pen = QPen(QColor(0, 0, 0))
-                highlight_pen.setWidth(3)
-                detector.setPen(highlight_pen)
+                expiry = time.monotonic() + duration_ms / 1000.0
+                pending = self._hl_pending.get(detector)
+                if pending is not None:
+                    # Already highlighted: keep the original look, just extend
+                    self._hl_pending[detector] = (pending[0], pending[1], expiry)
+                else:
+                    self._hl_pending[detector] = (detector.brush(), detector.pen(), expiry)
 
-                def _restore():
-                    try:
-                        detector.setBrush(orig_brush)
-                        detector.setPen(orig_pen)
-                    except Exception:
-                        pass
+                # Set bright yellow background with thick black outline
+                detector.setBrush(_BRUSH_HL)
+                detector.setPen(_PEN_HL)
 
-                QTimer.singleShot(duration_ms, _restore)
+                if not self._hl_timer.isActive():
+                    self._hl_timer.start()
             except Exception:
                 pass
         except Exception:
             pass
 
+    def _hl_tick(self):
+        """Restore the original look of detectors whose highlight has expired."""
+        now = time.monotonic()
+        expired = [d for d, entry in self._hl_pending.items() if entry[2] <= now]
+        for d in expired:
+            orig_brush, orig_pen, _ = self._hl_pending.pop(d)
+            try:
+                d.setBrush(orig_brush)
+                d.setPen(orig_pen)
+            except Exception:
+                pass
+        if not self._hl_pending:
+            self._hl_timer.stop()
+
     def add_line(self, start_detector, end_detector):
         """Add a visual line connecting two detectors and track it."""
-        from PyQt6.QtWidgets import QGraphicsLineItem
-
-        line = QGraphicsLineItem(start_detector.pos().x(), start_detector.pos().y(), end_detector.pos().x(), end_detector.pos().y())
-        pen = QPen(Qt.GlobalColor.black)
-        pen.setWidth(2)
-        line.setPen(pen)
-        line.setZValue(1)
-        self.scene.addItem(line)
-        self.lines.append({'item': line, 'start': start_detector, 'end': end_detector})
+        line = {'start': start_detector, 'end': end_detector}
+        self.lines.append(line)
+        start_detector.attached_lines.append(line)
+        if end_detector is not start_detector:
+            end_detector.attached_lines.append(line)
+        if not self._bulk_loading:
+            self._append_line_to_path(self._lines_path, line)
+            self._lines_path_item.setPath(self._lines_path)
         return line
 
+    @staticmethod
+    def _append_line_to_path(path, ln):
+        """Append line `ln` to `path` as a moveTo/lineTo pair and record its index.
+
+        QPainterPath drops a lineTo to the current point, and the next moveTo
+        replaces the lone moveTo left behind, so a zero-length line gets no pair
+        of its own. Its `_path_index` stays None; it draws nothing anyway.
+        """
+        ln['_path_index'] = None
+        s = ln['start'].pos()
+        e = ln['end'].pos()
+        path.moveTo(s)
+        path.lineTo(e)
+        i = path.elementCount() - 2
+        if i >= 0 and path.elementAt(i).isMoveTo() and path.elementAt(i + 1).isLineTo():
+            ln['_path_index'] = i
+
+    def _rebuild_lines_path(self):
+        """Rebuild the shared line path from `self.lines` (after moves or removals)."""
+        path = QPainterPath()
+        for ln in self.lines:
+            ln['_path_index'] = None
+            try:
+                self._append_line_to_path(path, ln)
+            except Exception:
+                continue
+        self._lines_path = path
+        self._lines_path_item.setPath(path)
+
+    def update_lines_for_detector(self, detector, exact=False):
+        """Redraw the manual lines if any of them is attached to `detector`.
+
+        Each line is a moveTo/lineTo pair in the shared path at `_path_index`,
+        so only the device's own lines are moved. Unless `exact`, changes below
+        half a scene pixel are skipped to spare the item a geometry change;
+        sync_lines_path() catches up once the drag ends.
+        """
+        attached = getattr(detector, 'attached_lines', None)
+        if not attached:
+            return
+        path = self._lines_path
+        changed = False
+        for ln in attached:
+            s = ln['start'].pos()
+            e = ln['end'].pos()
+            i = ln.get('_path_index')
+            if i is None:
+                if s != e:
+                    # a zero-length line got its length back: it needs a pair of its own
+                    self._rebuild_lines_path()
+                    return
+                continue
+            old_s = path.elementAt(i)
+            old_e = path.elementAt(i + 1)
+            d = abs(s.x() - old_s.x) + abs(s.y() - old_s.y) + abs(e.x() - old_e.x) + abs(e.y() - old_e.y)
+            if d == 0 or (d < 0.5 and not exact):
+                continue
+            path.setElementPositionAt(i, s.x(), s.y())
+            path.setElementPositionAt(i + 1, e.x(), e.y())
+            changed = True
+        if changed:
+            self._lines_path_item.setPath(path)
+
+    def sync_lines_path(self, detectors):
+        """Bring the lines of `detectors` exactly up to date (e.g. when a drag ends)."""
+        for d in detectors:
+            self.update_lines_for_detector(d, exact=True)
+
     def handle_line_click(self, detector):
         """Called when a detector is clicked while in line-mode. Creates a line between two consecutive clicks."""
         if self._line_start is None:
@@ -547,11 +1098,7 @@ class FloorPlanController:
             self.scale = meters_per_pixel
 
         # Reapply ranges so circles draw using the new scale
-        for d in list(self.detectors):
-            try:
-                self.set_detector_range(d, getattr(d, 'range', 0))
-            except Exception:
-                pass
+        self._reapply_detector_ranges()
 
         try:
             QMessageBox.information(self.parent, "Calibration", f"Calibration complete. Computed meters-per-pixel: {meters_per_pixel:.6f}")
@@ -611,14 +1158,10 @@ class FloorPlanController:
             self._measure_points.append(pos)
 
             # draw a small red dot
-            from PyQt6.QtWidgets import QGraphicsEllipseItem, QGraphicsSimpleTextItem
-            from PyQt6.QtGui import QBrush, QPen, QColor
-            from PyQt6.QtCore import QRectF
-
             r = 4.0
             dot = QGraphicsEllipseItem(pos.x() - r, pos.y() - r, r * 2, r * 2)
-            dot.setBrush(QBrush(QColor(200, 30, 30)))
-            dot.setPen(QPen(Qt.PenStyle.NoPen))
+            dot.setBrush(_BRUSH_MEASURE)
+            dot.setPen(_PEN_NONE)
             dot.setZValue(10)
             self.scene.addItem(dot)
             self._measure_items.append(dot)
@@ -628,9 +1171,7 @@ class FloorPlanController:
                 p1 = self._measure_points[0]
                 p2 = self._measure_points[1]
                 line_item = QGraphicsLineItem(p1.x(), p1.y(), p2.x(), p2.y())
-                pen = QPen(QColor(200, 30, 30))
-                pen.setWidth(2)
-                line_item.setPen(pen)
+                line_item.setPen(_PEN_MEASURE)
                 line_item.setZValue(9)
                 self.scene.addItem(line_item)
                 self._measure_items.append(line_item)
@@ -649,21 +1190,16 @@ class FloorPlanController:
                     text = f"{pix:.1f} px"
 
                 # place label above midpoint with small offset perpendicular to line
+                from utils.geometry import perp_unit
                 mx = (p1.x() + p2.x()) / 2.0
                 my = (p1.y() + p2.y()) / 2.0
-                length = math.hypot(dx, dy)
-                if length > 0:
-                    nx = -dy / length
-                    ny = dx / length
-                else:
-                    nx = 0
-                    ny = -1
+                nx, ny = perp_unit(dx, dy)
                 offset = 12.0
                 label_x = mx + nx * offset
                 label_y = my + ny * offset
 
                 txt_item = QGraphicsSimpleTextItem(text)
-                txt_item.setBrush(QBrush(QColor(200, 30, 30)))
+                txt_item.setBrush(_BRUSH_MEASURE)
                 txt_item.setZValue(11)
                 txt_item.setPos(label_x, label_y)
                 self.scene.addItem(txt_item)
@@ -683,22 +1219,61 @@ class FloorPlanController:
         except Exception:
             pass
 
-    def update_detector_colors(self):
-        """Set detectors to green when their serial number is unique, otherwise red."""
-        counts = {}
-        for d in self.detectors:
-            sn = getattr(d, 'serial_number', '') or ''
-            counts[sn] = counts.get(sn, 0) + 1
+    def _on_serial_added(self, detector, sn):
+        """Count `detector` under serial `sn` and recolor only detectors whose uniqueness changed."""
+        siblings = self._sn_to_detectors[sn]
+        siblings.append(detector)
+        count = self._sn_counts.get(sn, 0) + 1
+        self._sn_counts[sn] = count
+        # On a 1 -> 2 transition the previously unique sibling turns orange too
+        affected = siblings if (sn and count == 2) else [detector]
+        brush = _BRUSH_GREEN if (sn and count == 1) else _BRUSH_ORANGE
+        for d in affected:
+            try:
+                d.setBrush(brush)
+            except Exception:
+                pass
 
-        for d in self.detectors:
-            sn = getattr(d, 'serial_number', '') or ''
+    def _on_serial_removed(self, detector, sn):
+        """Uncount `detector` from serial `sn`; returns False if it was not counted under `sn`."""
+        siblings = self._sn_to_detectors.get(sn)
+        if not siblings or detector not in siblings:
+            return False
+        siblings.remove(detector)
+        count = self._sn_counts.get(sn, 0) - 1
+        if count <= 0:
+            self._sn_counts.pop(sn, None)
+            self._sn_to_detectors.pop(sn, None)
+            return True
+        self._sn_counts[sn] = count
+        # On a 2 -> 1 transition the remaining detector becomes unique
+        if sn and count == 1:
             try:
-                if sn and counts.get(sn, 0) == 1:
-                    d.setBrush(QBrush(QColor(0, 200, 0)))  # Green for unique serial
-                else:
-                    d.setBrush(QBrush(QColor(255, 140, 0)))  # Orange for non-unique or empty serial
+                siblings[0].setBrush(_BRUSH_GREEN)
             except Exception:
                 pass
+        return True
+
+    def update_detector_colors(self):
+        """Set detectors to green when their serial number is unique, otherwise red.
+
+        This is the full pass; it also rebuilds the incremental serial counts.
+        """
+        # One pass reads each serial; the coloring pass then works per serial group
+        by_sn = defaultdict(list)
+        for d in self.detectors:
+            by_sn[d.serial_number or ''].append(d)
+        self._sn_counts = {sn: len(group) for sn, group in by_sn.items()}
+        self._sn_to_detectors = by_sn
+
+        for sn, group in by_sn.items():
+            # Green for unique serial, orange for non-unique or empty serial
+            brush = _BRUSH_GREEN if sn and len(group) == 1 else _BRUSH_ORANGE
+            for d in group:
+                try:
+                    d.setBrush(brush)
+                except Exception:
+                    pass
         # Also update auto arrows based on address order/grouping
         try:
             self.update_address_arrows()
@@ -707,22 +1282,36 @@ class FloorPlanController:
 
     def update_range_visibility(self):
         """Show or hide range circles for all detectors based on controller setting."""
-        for d in self.detectors:
-            try:
-                if getattr(d, 'range_circle', None):
-                    d.range_circle.setVisible(bool(self.show_ranges))
-            except Exception:
-                pass
+        try:
+            self._range_overlay.setVisible(bool(self.show_ranges))
+        except Exception:
+            pass
+
+    def refresh_range_overlay(self):
+        """Recompute and repaint range circles after a range or position change."""
+        if self._bulk_loading or self._ranges_deferred:
+            return
+        try:
+            self._range_overlay.refresh()
+        except Exception:
+            pass
+
+    def update_detector_range_overlay(self, detector):
+        """Repaint the range overlay after one detector moved or its range changed."""
+        if self._bulk_loading or self._ranges_deferred:
+            return
+        try:
+            self._range_overlay.include(detector.pos(), getattr(detector, '_range_px', None))
+        except Exception:
+            pass
 
     def update_arrow_visibility(self):
         """Show or hide auto-drawn address arrows based on controller setting."""
-        for obj in getattr(self, '_auto_arrows', []):
-            try:
-                vis = bool(self.show_arrows)
-                obj.get('line').setVisible(vis)
-                obj.get('head').setVisible(vis)
-            except Exception:
-                pass
+        if self.show_arrows and self._arrows_stale:
+            # skipped rebuilds while hidden; this also applies the visibility
+            self.update_address_arrows()
+            return
+        self._auto_arrow_item.setVisible(bool(self.show_arrows))
 
     def set_show_arrows(self, show: bool):
         """Toggle showing address-order arrows and update visibility.
@@ -740,110 +1329,77 @@ class FloorPlanController:
         except Exception:
             pass
 
+    def schedule_address_arrows(self):
+        """Rebuild the address arrows once control returns to the event loop.
+
+        Called for every position change while a device is dragged; however many
+        moves arrive before the next pass, update_address_arrows() runs once.
+        """
+        if not self.show_arrows:
+            # hidden: just marks the arrows stale
+            self.update_address_arrows()
+        elif not self._arrow_timer.isActive():
+            self._arrow_timer.start()
+
     def update_address_arrows(self):
         """Automatically create thin light-gray arrows between devices that share the same bus and group.
 
         Arrows are drawn from the device with the lower numeric address to the higher one.
-        Existing auto-arrows are cleared and recreated.
+        The shared arrow paths are rebuilt from scratch. While arrows are hidden
+        the rebuild is deferred until they are shown again.
         """
-        # Clear existing auto arrows
-        try:
-            for obj in list(getattr(self, '_auto_arrows', []) or []):
-                try:
-                    if obj.get('line') is not None:
-                        self.scene.removeItem(obj.get('line'))
-                except Exception:
-                    pass
-                try:
-                    if obj.get('head') is not None:
-                        self.scene.removeItem(obj.get('head'))
-                except Exception:
-                    pass
-        except Exception:
-            pass
-        self._auto_arrows = []
-
-        # Group detectors by (bus, group) and sort by address
-        groups = {}
-        for d in self.detectors:
-            try:
-                bus_raw = (getattr(d, 'bus_number', '') or '').strip()
-                group_raw = (getattr(d, 'group', '') or '').strip()
-                addr = (getattr(d, 'address', '') or '').strip()
-                if not (bus_raw and group_raw and addr):
-                    continue
-
-                # Normalize bus and group to integers when possible so '01' == '1'
-                try:
-                    bus_key = int(bus_raw)
-                except Exception:
-                    bus_key = bus_raw
-                try:
-                    group_key = int(group_raw)
-                except Exception:
-                    group_key = group_raw
-
-                # Try numeric address ordering, fall back to string
-                try:
-                    addr_val = int(addr)
-                except Exception:
-                    try:
-                        addr_val = float(addr)
-                    except Exception:
-                        addr_val = addr
-
-                groups.setdefault((bus_key, group_key), []).append((addr_val, d))
-            except Exception:
-                continue
-
-        import math
-        from PyQt6.QtGui import QPolygonF
-        from PyQt6.QtCore import QPointF
-        from PyQt6.QtWidgets import QGraphicsLineItem, QGraphicsPolygonItem
+        # any rebuild scheduled by schedule_address_arrows() is covered by this one
+        self._arrow_timer.stop()
+        if not self.show_arrows:
+            # Device moves, edits and add/remove all land here; no need to
+            # rebuild paths nobody sees
+            self._arrows_stale = True
+            self._auto_arrow_item.setVisible(False)
+            return
+        self._arrows_stale = False
 
-        for key, items in groups.items():
-            try:
-                # sort with numeric values first, otherwise lexicographic
-                try:
-                    items_sorted = sorted(items, key=lambda x: (float(x[0]) if isinstance(x[0], (int, float)) else float('inf'), str(x[0])))
-                except Exception:
-                    items_sorted = sorted(items, key=lambda x: str(x[0]))
-            except Exception:
-                items_sorted = items
+        # Group by (bus, group) and order by address with one lexsort over the
+        # cached parsed keys; consecutive rows of a group become arrows
+        import numpy as np
 
-            for i in range(len(items_sorted) - 1):
-                s = items_sorted[i][1]
-                e = items_sorted[i + 1][1]
-                try:
-                    sx = s.pos().x(); sy = s.pos().y()
-                    ex = e.pos().x(); ey = e.pos().y()
-                    if sx == ex and sy == ey:
-                        continue
-
-                    pen = QPen(QColor(80, 80, 80))
-                    pen.setWidth(3)
-                    line = QGraphicsLineItem(sx, sy, ex, ey)
-                    line.setPen(pen)
-                    line.setZValue(0.5)
-                    self.scene.addItem(line)
-
-                    # arrow head triangle at end
-                    dx = ex - sx; dy = ey - sy
-                    angle = math.atan2(dy, dx)
-                    hl = 16.0; hw = 8.0
-                    p1 = QPointF(ex, ey)
-                    p2 = QPointF(ex - hl * math.cos(angle) + hw * math.sin(angle), ey - hl * math.sin(angle) - hw * math.cos(angle))
-                    p3 = QPointF(ex - hl * math.cos(angle) - hw * math.sin(angle), ey - hl * math.sin(angle) + hw * math.cos(angle))
-                    poly = QPolygonF([p1, p2, p3])
-                    head = QGraphicsPolygonItem(poly)
-                    head.setBrush(QBrush(QColor(80, 80, 80)))
-                    head.setPen(QPen(Qt.PenStyle.NoPen))
-                    head.setZValue(0.5)
-                    self.scene.addItem(head)
-
-                    self._auto_arrows.append({'line': line, 'head': head, 'start': s, 'end': e})
-                except Exception:
-                    continue
+        buses, groups, addrs, xy = [], [], [], []
+        for d in self.detectors:
+            b, g, a = _detector_keys(d)
+            if b != '' and g != '' and a != '':
+                buses.append(b); groups.append(g); addrs.append(a)
+                p = d.pos()
+                xy.append((p.x(), p.y()))
+        bus_n, bus_t = _sort_keys(buses)
+        group_n, group_t = _sort_keys(groups)
+        addr_n, addr_t = _sort_keys(addrs)
+        order = np.lexsort((addr_t, addr_n, group_t, group_n, bus_t, bus_n))
+        prev, nxt = order[:-1], order[1:]
+        same = ((bus_n[prev] == bus_n[nxt]) & (bus_t[prev] == bus_t[nxt])
+                & (group_n[prev] == group_n[nxt]) & (group_t[prev] == group_t[nxt]))
+        pos = np.array(xy, dtype=np.float64).reshape(-1, 2)
+
+        start = pos[prev[same]]
+        end = pos[nxt[same]]
+        keep = np.any(start != end, axis=1)
+        start, end = start[keep], end[keep]
+
+        # Arrow head triangles at the ends, for all arrows at once (JIT-compiled when Numba is installed)
+        from utils import geometry
+        corners = geometry.arrow_heads(start, end, 16.0, 8.0)
+
+        # Only path construction is left per arrow
+        shafts = QPainterPath()
+        heads = QPainterPath()
+        for (sx, sy, ex, ey, x2, y2, x3, y3) in np.hstack((start, end, corners)).tolist():
+            shafts.moveTo(sx, sy)
+            shafts.lineTo(ex, ey)
+            heads.moveTo(ex, ey)
+            heads.lineTo(x2, y2)
+            heads.lineTo(x3, y3)
+            heads.closeSubpath()
+
+        self._auto_arrow_item.setPath(shafts)
+        self._auto_arrow_heads.setPath(heads)
 
         # Apply visibility preference
         try:
@@ -872,34 +1428,61 @@ class FloorPlanController:
             # fallback: set without drawing
             detector.set_range(range_meters, pixels_per_meter=None)
     
-    def remove_detector(self, detector):
-        if detector in self.detectors:
-            # Remove any lines connected to this detector
-            for ln in list(self.lines):
+    def _reapply_detector_ranges(self):
+        """Recompute every detector's range radius for the current scale.
+
+        The range overlay is refreshed once at the end instead of once per
+        detector, which made recalibrating quadratic in the number of detectors.
+        """
+        self._ranges_deferred = True
+        try:
+            for d in list(self.detectors):
                 try:
-                    if ln.get('start') is detector or ln.get('end') is detector:
-                        try:
-                            self.scene.removeItem(ln.get('item'))
-                        except Exception:
-                            pass
-                        try:
-                            self.lines.remove(ln)
-                        except Exception:
-                            pass
+                    self.set_detector_range(d, getattr(d, 'range', 0))
                 except Exception:
                     pass
+        finally:
+            self._ranges_deferred = False
+        self.refresh_range_overlay()
 
-            self.detectors.remove(detector)
+    def remove_detector(self, detector):
+        # Locate the detector once by identity; `in` followed by list.remove()
+        # scanned the list twice
+        pos = next((i for i, d in enumerate(self.detectors) if d is detector), None)
+        if pos is not None:
+            # Remove any lines connected to this detector
+            attached = detector.attached_lines
+            if attached:
+                doomed = {id(ln) for ln in attached}
+                self.lines = [ln for ln in self.lines if id(ln) not in doomed]
+                for ln in attached:
+                    other = ln['end'] if ln['start'] is detector else ln['start']
+                    other.attached_lines = [x for x in other.attached_lines if x is not ln]
+                detector.attached_lines = []
+                if not self._bulk_loading:
+                    self._rebuild_lines_path()
+
+            del self.detectors[pos]
+            self._search_idx = None
+            self._addr_max_by_bg = None
             try:
                 self.scene.removeItem(detector)
             except Exception:
                 pass
+            if getattr(detector, '_range_px', None):
+                self.refresh_range_overlay()
 
-            # update colors after removal
-            try:
-                self.update_detector_colors()
-            except Exception:
-                pass
+            # update colors after removal (deferred while bulk loading)
+            if not self._bulk_loading:
+                self._tune_viewport_update_mode()
+                try:
+                    if not self._on_serial_removed(detector, getattr(detector, 'serial_number', '') or ''):
+                        # serial changed since it was counted; fall back to a full pass
+                        self.update_detector_colors()
+                    else:
+                        self.update_address_arrows()
+                except Exception:
+                    pass
     
     def set_scale(self, meters_per_pixel):
         # The API accepts either a numeric meters_per_pixel or a string like "1:100".
@@ -919,14 +1502,17 @@ class FloorPlanController:
 
                 # Only attempt auto-calibration if we have a PDF floorplan and page info
                 try:
-                    if getattr(self, 'floorplan_path', None) and str(self.floorplan_path).lower().endswith('.pdf') and getattr(self, 'pdf_page', None) is not None and getattr(self, 'floor_plan_item', None) is not None:
+                    if getattr(self, 'floorplan_path', None) and str(self.floorplan_path).lower().endswith('.pdf') and getattr(self, 'pdf_page', None) is not None and self.floor_plan_item is not None:
                         from utils import pdf_tools
-                        w_m, h_m, paper_name = pdf_tools.get_pdf_page_physical_size(self.floorplan_path, self.pdf_page)
+                        try:
+                            w_m, h_m, paper_name = pdf_tools.get_pdf_page_physical_size_cached(self.floorplan_path, self.pdf_page)
+                        finally:
+                            pdf_tools.close_cached()
                         if w_m is not None:
                             # Use page width (in meters) times scale factor as real-world width
                             real_world_width_m = float(w_m) * float(factor)
                             try:
-                                pixel_width = float(self.floor_plan_item.pixmap().width())
+                                pixel_width = float(self.floor_plan_item.pixmap().width()) * self.floor_plan_item.scale()
                             except Exception:
                                 pixel_width = None
 
@@ -938,11 +1524,7 @@ class FloorPlanController:
                                     self.scale = meters_per_pixel_val
 
                                 # Reapply detector ranges so circles draw correctly
-                                for d in list(self.detectors):
-                                    try:
-                                        self.set_detector_range(d, getattr(d, 'range', 0))
-                                    except Exception:
-                                        pass
+                                self._reapply_detector_ranges()
 
                                 try:
                                     QMessageBox.information(self.parent, "Auto-Calibration", f"Auto-calibrated using paper size {paper_name} at scale {text}. Computed meters-per-pixel: {self.scale:.8f}\nPlease verify detector ranges are correct.")
@@ -995,35 +1577,9 @@ class FloorPlanController:
             self._auto_bus_raw = str(bus_raw) if bus_raw is not None else ''
             self._auto_group_raw = str(group_raw) if group_raw is not None else ''
 
-            # Determine next address by scanning existing detectors
-            max_addr = 0
-            for d in self.detectors:
-                try:
-                    dbus = (getattr(d, 'bus_number', '') or '').strip()
-                    dgroup = (getattr(d, 'group', '') or '').strip()
-                    if not dbus or not dgroup:
-                        continue
-                    # normalize comparison
-                    try:
-                        if int(dbus) == int(self._auto_bus_raw) and int(dgroup) == int(self._auto_group_raw):
-                            a = getattr(d, 'address', '') or ''
-                            try:
-                                a_i = int(str(a))
-                                if a_i > max_addr:
-                                    max_addr = a_i
-                            except Exception:
-                                pass
-                    except Exception:
-                        # fallback to string compare
-                        if dbus == self._auto_bus_raw and dgroup == self._auto_group_raw:
-                            try:
-                                a_i = int(str(getattr(d, 'address', '') or ''))
-                                if a_i > max_addr:
-                                    max_addr = a_i
-                            except Exception:
-                                pass
-                except Exception:
-                    continue
+            # Next address after the highest one already used on this bus and group
+            target = (_parse_key(self._auto_bus_raw), _parse_key(self._auto_group_raw))
+            max_addr = self._address_max_index().get(target, 0)
             self._next_address = max_addr + 1 if max_addr >= 0 else 1
         except Exception:
             # defensively disable on error
@@ -1032,6 +1588,26 @@ class FloorPlanController:
             self._auto_group_raw = None
             self._next_address = None
 
+    def _address_max_index(self):
+        """Return {(bus, group): highest integer address}, rebuilding it if stale.
+
+        Auto-addressed placements update it in place; any other add, a removal
+        or a field edit (invalidate_search_cache) marks it stale.
+        """
+        index = self._addr_max_by_bg
+        if index is None:
+            index = {}
+            for d in self.detectors:
+                self._note_address(index, d)
+            self._addr_max_by_bg = index
+        return index
+
+    @staticmethod
+    def _note_address(index, d):
+        bk, gk, ak = _detector_keys(d)
+        if bk != '' and gk != '' and type(ak) is int and ak > index.get((bk, gk), 0):
+            index[(bk, gk)] = ak
+
     def stop_auto_address(self):
         try:
             self._auto_address_enabled = False
@@ -1041,25 +1617,156 @@ class FloorPlanController:
         except Exception:
             pass
     
-    def export_to_pdf(self, file_path, include_arrows: bool = False):
-        """Export the floor plan and detector details to PDF."""
-        from reportlab.lib import colors
+    def _render_export(self, painter, target_rect, source_rect, plan_pixmap=None):
+        """Paint the plan content for export without walking the scene graph.
+
+        Draws in stacking order: floor plan, range circles (if shown), devices,
+        address arrows (if shown) and manual lines. Measurement overlays and
+        selection decorations are not exported. Like QGraphicsScene.render,
+        `source_rect` is scaled into `target_rect` keeping its aspect ratio.
+        `plan_pixmap`, if given, is drawn stretched over the floor plan instead
+        of its own (e.g. a downscaled copy).
+        """
+        sw = max(1.0, float(source_rect.width()))
+        sh = max(1.0, float(source_rect.height()))
+        k = min(target_rect.width() / sw, target_rect.height() / sh)
+        base = QTransform(k, 0, 0, k, target_rect.x() - source_rect.x() * k, target_rect.y() - source_rect.y() * k)
+
+        painter.save()
+        try:
+            fp = self.floor_plan_item
+            if fp is not None and fp.isVisible():
+                painter.setTransform(fp.sceneTransform() * base)
+                if plan_pixmap is None:
+                    painter.drawPixmap(fp.offset(), fp.pixmap())
+                else:
+                    painter.drawPixmap(QRectF(fp.offset(), QSizeF(fp.pixmap().size())), plan_pixmap,
+                                       QRectF(plan_pixmap.rect()))
+
+            if self._range_overlay.isVisible():
+                option = QStyleOptionGraphicsItem()
+                option.exposedRect = QRectF(source_rect)
+                painter.setTransform(base)
+                self._range_overlay.paint(painter, option)
+
+            for d in self.detectors:
+                if d.isVisible():
+                    painter.setTransform(d.sceneTransform() * base)
+                    d.paint_for_export(painter)
+
+            painter.setTransform(base)
+            if self._auto_arrow_item.isVisible():
+                painter.setPen(self._auto_arrow_item.pen())
+                painter.setBrush(Qt.BrushStyle.NoBrush)
+                painter.drawPath(self._auto_arrow_item.path())
+                painter.setPen(self._auto_arrow_heads.pen())
+                painter.setBrush(self._auto_arrow_heads.brush())
+                painter.drawPath(self._auto_arrow_heads.path())
+
+            painter.setPen(self._lines_path_item.pen())
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            painter.drawPath(self._lines_path_item.path())
+        finally:
+            painter.restore()
+
+    def _plan_fingerprint(self, *layout):
+        """Return a comparable key for everything _render_export draws, plus `layout`."""
+        fp = self.floor_plan_item
+        plan = None
+        if fp is not None:
+            plan = (fp.pixmap().cacheKey(), fp.sceneTransform(), fp.offset(), fp.isVisible())
+        return (
+            layout,
+            plan,
+            self._range_overlay.isVisible(),
+            [d.export_fingerprint() for d in self.detectors],
+            self._auto_arrow_item.isVisible(),
+            self._auto_arrow_item.path(),
+            self._auto_arrow_heads.path(),
+            self._lines_path_item.path(),
+        )
+
+    def _render_plan_pdf(self, pagesize, x, y, width, height, source_rect):
+        """Render the plan into a one-page PDF with Qt's PDF engine.
+
+        Devices, labels, ranges and arrows stay vector graphics; only the floor
+        plan (downscaled to EXPORT_DPI at its printed size) and the device icons
+        are embedded as images.
+
+        Args:
+            pagesize: (width, height) of the page in points
+            x, y: bottom-left corner of the plan area in points (PDF coordinates)
+            width, height: size of the plan area in points
+            source_rect: scene rectangle to draw
+
+        Returns:
+            The PDF as bytes; repeated exports of an unchanged plan reuse the
+            previous render
+        """
+        key = self._plan_fingerprint(tuple(pagesize), x, y, width, height,
+                                     (source_rect.x(), source_rect.y(), source_rect.width(), source_rect.height()))
+        for cached_key, data in self._plan_pdf_cache:
+            if cached_key == key:
+                return data
+
+        buffer = QBuffer()
+        buffer.open(QBuffer.OpenModeFlag.WriteOnly)
+        writer = QPdfWriter(buffer)
+        writer.setResolution(PLAN_PDF_RESOLUTION)
+        page_size = QPageSize(QSizeF(*pagesize), QPageSize.Unit.Point, '', QPageSize.SizeMatchPolicy.ExactMatch)
+        writer.setPageLayout(QPageLayout(page_size, QPageLayout.Orientation.Portrait, QMarginsF(0, 0, 0, 0)))
+        # Qt's origin is top-left; measured from the top of the ReportLab page, as
+        # the stamp is aligned there (Qt rounds point page sizes to whole points)
+        k = PLAN_PDF_RESOLUTION / 72.0
+        target = QRectF(x * k, (pagesize[1] - y - height) * k, width * k, height * k)
+
+        plan_pixmap = None
+        fp = self.floor_plan_item
+        if fp is not None:
+            # Device pixels the plan covers at EXPORT_DPI; Qt would embed it at full size
+            sw = max(1.0, float(source_rect.width()))
+            sh = max(1.0, float(source_rect.height()))
+            pts_per_scene = min(width / sw, height / sh)
+            plan_w = fp.sceneBoundingRect().width() * pts_per_scene / 72.0 * EXPORT_DPI
+            pm = fp.pixmap()
+            if pm.width() > plan_w >= 1:
+                plan_pixmap = pm.scaledToWidth(int(math.ceil(plan_w)), Qt.TransformationMode.SmoothTransformation)
+
+        painter = QPainter(writer)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        try:
+            self._render_export(painter, target, source_rect, plan_pixmap)
+        finally:
+            painter.end()
+        buffer.close()
+        data = bytes(buffer.data())
+        # Keep the last two renders (e.g. with and without arrows)
+        self._plan_pdf_cache = [(key, data)] + self._plan_pdf_cache[:1]
+        return data
+
+    def export_to_pdf(self, file_path, include_arrows: bool = False, vector_plan: bool = True):
+        """Export the floor plan and detector details to PDF.
+
+        With `vector_plan` the plan page is drawn by Qt's PDF engine (devices,
+        labels and arrows as vector graphics); otherwise it is embedded as a
+        single EXPORT_DPI raster image.
+        """
         from reportlab.lib.pagesizes import A4, landscape
-        from reportlab.lib.units import cm
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import cm, inch
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak
         from reportlab.pdfbase import pdfmetrics
         from reportlab.pdfbase.ttfonts import TTFont
-        from PyQt6.QtCore import QBuffer, QByteArray
-        from PyQt6.QtGui import QImage
-        import io
+        import tempfile
         from datetime import datetime
+        from utils import pdf_export
 
         pagesize = landscape(A4)
         page_w, page_h = pagesize
         doc = SimpleDocTemplate(file_path, pagesize=pagesize)
         story = []
-        styles = getSampleStyleSheet()
+        # Shared paragraph styles (built once per process in pdf_export)
+        normal_style = pdf_export.NORMAL_STYLE
 
         # Validate project before exporting
         try:
@@ -1109,23 +1816,11 @@ class FloorPlanController:
             pass
 
         # Front page: project/title/metadata + optional logo
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=32,
-            spaceAfter=20
-        )
         project_name = getattr(self.parent, 'project_name', 'Untitled Project')
-        story.append(Paragraph(f"{project_name}", title_style))
+        story.append(Paragraph(f"{project_name}", pdf_export.TITLE_STYLE))
 
         # Add current date and calibration/project metadata
-        date_style = ParagraphStyle(
-            'DateStyle',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.gray
-        )
-        story.append(Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", date_style))
+        story.append(Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", pdf_export.DATE_STYLE))
 
         # Calibration/scale info
         try:
@@ -1134,18 +1829,18 @@ class FloorPlanController:
                 scale_info = f"Scale: {self.scale:.6f} meters/pixel"
             else:
                 scale_info = f"Scale: {str(self.scale)}"
-            story.append(Paragraph(scale_info, styles['Normal']))
+            story.append(Paragraph(scale_info, normal_style))
         except Exception:
             pass
 
         # Project floorplan path and detector count
         #try:
         #    fp = getattr(self, 'floorplan_path', None) or ''
-        #    story.append(Paragraph(f"Floorplan: {fp}", styles['Normal']))
+        #    story.append(Paragraph(f"Floorplan: {fp}", normal_style))
         #except Exception:
         #    pass
         try:
-            story.append(Paragraph(f"Detectors: {len(self.detectors)}", styles['Normal']))
+            story.append(Paragraph(f"Detectors: {len(self.detectors)}", normal_style))
         except Exception:
             pass
 
@@ -1164,125 +1859,134 @@ class FloorPlanController:
         story.append(PageBreak())
 
         # Floor Plan (on its own page)
-        if hasattr(self, 'floor_plan_item') and self.floor_plan_item:
-            # Create QImage from the scene. QImage requires integer dimensions.
+        plan_slot = None
+        plan_tmp = None
+        if self.floor_plan_item is not None:
             scene_rect = self.scene.sceneRect()
-            w = max(1, int(math.ceil(scene_rect.width())))
-            h = max(1, int(math.ceil(scene_rect.height())))
-
-            image = QImage(w, h, QImage.Format.Format_ARGB32)
-            # Fill with white using a Qt color (reportlab.colors.white is not compatible)
-            image.fill(QColor(255, 255, 255))
-
-            painter = QPainter(image)
-            # Render the scene into the QImage
-            try:
-                self.scene.render(painter)
-            finally:
-                painter.end()
-
-            # Convert QImage to PNG bytes via QBuffer
-            buffer = QBuffer()
-            buffer.open(QBuffer.OpenModeFlag.ReadWrite)
-            image.save(buffer, "PNG")
-            image_data = bytes(buffer.data())
-
-            # Add floor plan image to PDF
-            img = Image(io.BytesIO(image_data))
             # Compute available area on the page (leave margins and space for header/footer)
             available_w = page_w - 2*cm
             available_h = page_h - 6*cm
             scene_w = max(1.0, float(scene_rect.width()))
             scene_h = max(1.0, float(scene_rect.height()))
             scale = min(available_w / scene_w, available_h / scene_h)
-            img.drawWidth = float(scene_w) * scale
-            img.drawHeight = float(scene_h) * scale
-            story.append(img)
+            draw_w = float(scene_w) * scale
+            draw_h = float(scene_h) * scale
+
+            if vector_plan:
+                # Leave the area empty; after the build the plan is drawn by Qt's
+                # PDF engine and stamped onto that page, keeping it vector graphics
+                plan_slot = pdf_export.ReservedArea(draw_w, draw_h)
+                story.append(plan_slot)
+            else:
+                # Rasterize directly at the printed size and EXPORT_DPI instead of at full
+                # scene resolution, which would only be scaled down again by ReportLab.
+                # Render into a QPixmap (native backend, faster than a software ARGB32
+                # QImage for rasterize-then-encode). Requires integer dimensions.
+                w = max(1, int(math.ceil(draw_w / inch * EXPORT_DPI)))
+                h = max(1, int(math.ceil(draw_h / inch * EXPORT_DPI)))
+
+                pm = QPixmap(w, h)
+                # Fill with white using a Qt color (reportlab.colors.white is not compatible)
+                pm.fill(QColor(255, 255, 255))
+
+                painter = QPainter(pm)
+                painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+                painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+                # Paint the plan content directly into the pixmap
+                try:
+                    self._render_export(painter, QRectF(0, 0, w, h), scene_rect)
+                finally:
+                    painter.end()
+
+                # Hand the pixels to ReportLab through a temporary file that Qt writes
+                # directly, so no copy of the image is held in Python. ReportLab decodes
+                # PNG/PPM and Flate-compresses the raw pixels itself, so a PNG encode here
+                # would only be undone again: line art goes as uncompressed PPM.
+                # Photographic plans (JPEG originals) go as JPEG, which ReportLab embeds
+                # without re-encoding.
+                photo = (getattr(self, 'floorplan_blob', None) or b'')[:3] == b'\xff\xd8\xff'
+                fd, plan_tmp = tempfile.mkstemp(suffix='.jpg' if photo else '.ppm')
+                os.close(fd)
+                if not (pm.save(plan_tmp, "JPG", 90) if photo else pm.save(plan_tmp, "PPM")):
+                    raise OSError(f"Could not write the floor plan image: {plan_tmp}")
+                # ReportLab keeps the whole document in memory until doc.build writes it
+                # out, so release the pixmap before the build starts.
+                del pm
+
+                # Add floor plan image to PDF (read from the file during the build)
+                img = Image(plan_tmp)
+                img.drawWidth = draw_w
+                img.drawHeight = draw_h
+                story.append(img)
             story.append(PageBreak())
 
-        # Group detectors by bus number
-        bus_groups = {}
+        # Group detectors by bus number in a single pass
+        bus_groups = defaultdict(list)
         for d in self.detectors:
-            bus_num = getattr(d, 'bus_number', '') or 'Unassigned'
-            if bus_num not in bus_groups:
-                bus_groups[bus_num] = []
-            bus_groups[bus_num].append(d)
+            bus_groups[d.bus_number or 'Unassigned'].append(d)
 
-        # Sort detectors within each bus by address
+        # Sort detectors within each bus by address: numbers by value (so '2' comes
+        # before '10'), then anything else as text. Keys come from the parsed
+        # address cached on each device; sort() is stable for equal addresses.
         for bus in bus_groups.values():
-            bus.sort(key=lambda d: getattr(d, 'address', ''))
-
-        # Create detector tables for each bus; each bus starts on a new page
-        for bus_index, bus_num in enumerate(sorted(bus_groups.keys())):
-            # Start each bus on a new page (skip before the first bus since the floor plan already had its page)
-            
-            
-
-            # Bus header
-            story.append(Paragraph(f"Bus {bus_num}", styles['Heading2']))
-            story.append(Spacer(1, 10))
+            bus.sort(key=_address_sort_key)
 
-            # Detector table with columns: Full address label, Serial number, Room ID, QR data, Paired Detector SN, Type
-            header = ['Full\naddress', 'Serial number', 'Room ID', 'QR data', 'Paired\nDetector SN', 'Type']
-            data = [header]
-            for d in bus_groups[bus_num]:
-                full_label = ''
-                try:
-                    full_label = getattr(d, 'get_full_address_label', lambda: '')() or ''
-                except Exception:
-                    full_label = ''
-
-                qr_para = Paragraph((getattr(d, 'qr_data', '') or '').replace('\n', '<br />'), styles['Normal'])
-
-                row = [
-                    full_label,
-                    getattr(d, 'serial_number', ''),
-                    getattr(d, 'room_id', ''),
-                    qr_para,
-                    getattr(d, 'paired_sn', ''),
-                    getattr(d, 'device_type', 'Detector')
-                ]
-                data.append(row)
-            
-           
-
-            # Column widths: allocate space to QR data and Paired SN where Bus/Group/Address used to be
-            colWidths = [2*cm, 4.5*cm, 3*cm, 8*cm, 3.5*cm, 2*cm]
-            table = Table(data, colWidths=colWidths, repeatRows=1)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('ALIGN', (0, 0), (1, -1), 'CENTER'),
-                ('ALIGN', (2, 0), (2, -1), 'CENTER'),
-                ('ALIGN', (4, 0), (4, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ]))
-            story.append(table)
-            story.append(PageBreak())
+        # Add page numbers and project info in footer. The page callbacks run at the
+        # start of each page, before its flowables draw, so the canvas state is still
+        # saved/restored; everything that does not change per page is computed here.
+        footer_y = 0.75 * cm
+        footer_right = page_w - cm
+        footer_name = str(project_name)
 
-        # Add page numbers and project info in footer
         def footer(canvas, doc):
+            # Project name in bottom left: drawn once into a form XObject that
+            # every page references (a canvas-level check, since doc may be None)
+            if not canvas.hasForm('footer_name'):
+                canvas.beginForm('footer_name')
+                canvas.setFont('Helvetica', 9)
+                canvas.drawString(cm, footer_y, footer_name)
+                canvas.endForm()
             canvas.saveState()
+            canvas.doForm('footer_name')
             canvas.setFont('Helvetica', 9)
-            # Project name in bottom left
-            canvas.drawString(cm, 0.75 * cm, project_name)
             # Page numbers in bottom right
-            page_num = canvas.getPageNumber()
-            canvas.drawRightString(page_w - cm, 0.75 * cm, f"Page {page_num}")
+            canvas.drawRightString(footer_right, footer_y, "Page %d" % canvas.getPageNumber())
             canvas.restoreState()
 
-        # Build PDF with footer
+        # Create detector tables for each bus; each bus starts on a new page
+        bus_nums = sorted(bus_groups)
         try:
-            doc.build(story, onFirstPage=footer, onLaterPages=footer)
+            built = False
+            if len(bus_nums) > 1 and len(self.detectors) >= pdf_export.PARALLEL_MIN_ROWS:
+                # Large reports: lay out the bus sections in worker processes
+                try:
+                    row_values = pdf_export.row_values
+                    jobs = [(bus_num, [row_values(d) for d in bus_groups[bus_num]]) for bus_num in bus_nums]
+                    built = pdf_export.build_parallel(file_path, pagesize, story, jobs, footer)
+                except Exception:
+                    # fall back to the serial build below
+                    built = False
+
+            if not built:
+                build_row = pdf_export.build_row
+                for bus_num in bus_nums:
+                    rows = [build_row(d) for d in bus_groups[bus_num]]
+                    pdf_export.append_bus_section(story, bus_num, rows)
+
+                # Build PDF with footer (single pass: the report has no TOC or index, so no multiBuild)
+                with pdf_export.fast_streams():
+                    doc.build(story, onFirstPage=footer, onLaterPages=footer)
+
+            if plan_slot is not None and plan_slot.placed:
+                page_number, x, y = plan_slot.placed
+                overlay = self._render_plan_pdf(pagesize, x, y, draw_w, draw_h, scene_rect)
+                pdf_export.stamp_page(file_path, page_number, overlay)
         finally:
+            if plan_tmp is not None:
+                try:
+                    os.remove(plan_tmp)
+                except OSError:
+                    pass
             # Restore original arrow visibility
             try:
                 self.set_show_arrows(orig_show_arrows)
@@ -1,13 +1,37 @@
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
 from views.main_window import MainWindow
 
+def _preload_pdf_export():
+    """Import the PDF export stack while the app is idle, so the first export does not stall."""
+    try:
+        from utils import pdf_export
+        pdf_export.warm_up()
+    except Exception:
+        pass
+
+
+def _warm_up_geometry():
+    """Start compiling the spacing-check JIT kernels in the background."""
+    # Imported here, after start-up: NumPy and Numba take a while to load
+    from utils import geometry
+    geometry.warm_up_async()
+
+
 def main():
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
+    # Warm the spacing-check JIT cache once the window is up, off the UI thread
+    QTimer.singleShot(500, _warm_up_geometry)
+    # ReportLab takes a moment to import; do it after start-up, not on the first export
+    QTimer.singleShot(2000, _preload_pdf_export)
     sys.exit(app.exec())
 
 
 if __name__ == "__main__":
+    # Needed for the PDF export worker processes in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,81 @@
+from PyQt6.QtWidgets import QGraphicsItem
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QBrush, QColor
+
+
+class RangeOverlayItem(QGraphicsItem):
+    """Single scene item that paints the range circle of every detector.
+
+    Detectors only store their range radius in scene pixels (`_range_px`);
+    this item draws all circles in one paint() call instead of keeping one
+    ellipse item per detector in the scene index.
+    """
+
+    def __init__(self, controller):
+        super().__init__()
+        self.controller = controller
+        self._brush = QBrush(QColor(128, 128, 128, 64))  # Semi-transparent gray
+        self._bounds = QRectF()
+        # True when ranges changed while hidden; bounds are recomputed when shown
+        self._dirty = False
+        # Above the floor plan, behind the devices
+        self.setZValue(-1)
+        self.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+        # Needed so paint() receives the exposed rect for culling
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+
+    def _circles(self):
+        for d in getattr(self.controller, 'detectors', []):
+            r = getattr(d, '_range_px', None)
+            if r:
+                yield d.pos(), r
+
+    def refresh(self):
+        """Recompute the bounds after ranges or positions changed and repaint.
+
+        While the overlay is hidden this only marks the bounds dirty; they are
+        recomputed when it is shown again.
+        """
+        if not self.isVisible():
+            self._dirty = True
+            return
+        self._dirty = False
+        rect = QRectF()
+        for c, r in self._circles():
+            rect = rect.united(QRectF(c.x() - r, c.y() - r, 2 * r, 2 * r))
+        if rect != self._bounds:
+            self.prepareGeometryChange()
+            self._bounds = rect
+        self.update()
+
+    def include(self, center, r):
+        """Repaint after one circle moved or changed, growing the bounds to cover it.
+
+        Cheaper than refresh() as no other detector is looked at; the bounds may
+        stay larger than needed until the next refresh().
+        """
+        if not self.isVisible():
+            self._dirty = True
+            return
+        if r:
+            rect = QRectF(center.x() - r, center.y() - r, 2 * r, 2 * r)
+            if not self._bounds.contains(rect):
+                self.prepareGeometryChange()
+                self._bounds = self._bounds.united(rect)
+        self.update()
+
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.GraphicsItemChange.ItemVisibleHasChanged and value and self._dirty:
+            self.refresh()
+        return super().itemChange(change, value)
+
+    def boundingRect(self):
+        return self._bounds
+
+    def paint(self, painter, option, widget=None):
+        exposed = option.exposedRect
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self._brush)
+        for c, r in self._circles():
+            if exposed.intersects(QRectF(c.x() - r, c.y() - r, 2 * r, 2 * r)):
+                painter.drawEllipse(c, r, r)
@@ -1,27 +1,56 @@
-from PyQt6.QtWidgets import QGraphicsItem, QGraphicsTextItem, QGraphicsRectItem, QGraphicsPixmapItem
-from PyQt6.QtCore import Qt, QRectF
-from PyQt6.QtGui import QPen, QBrush, QColor, QFont, QPixmap
+from PyQt6.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem
+from PyQt6.QtCore import Qt, QRectF, QPointF
+from PyQt6.QtGui import QPen, QBrush, QColor, QFont, QFontInfo, QPixmap, QPainterPath, QStaticText, QTransform
 from pathlib import Path
 
 
+# Device labels: black text on a light, slightly transparent box
+_LABEL_TEXT_COLOR = QColor(0, 0, 0)
+_LABEL_BG_BRUSH = QBrush(QColor(240, 240, 240, 230))
+# Space around the text: the document margin QGraphicsTextItem labels had, plus padding
+_LABEL_MARGIN = 4
+_LABEL_PAD = 4
+
+
 class BaseDevice(QGraphicsItem):
     """Base class for all fire safety devices (detectors, IO boxes, call points)."""
     
     ICON_FILE = "M_s.png"  # Override in subclasses
+
+    # Class-level defaults for the fields shared by every device type. `range`
+    # and `paired_sn` are deliberately absent: hasattr(d, 'range') identifies
+    # devices with a detection range.
+    model = ""
+    bus_number = ""
+    group = ""
+    address = ""
+    room_id = ""
+    device_type = "Device"
+    serial_number = ""
+    qr_data = ""
+    brand = ""
+
+    # Icon pixmaps loaded so far, by ICON_FILE; QPixmap is implicitly shared,
+    # so every device of a type uses the same pixel data
+    _PIXMAP_CACHE = {}
+    # (room, address) label fonts, see _label_fonts
+    _LABEL_FONTS = None
     
     def __init__(self, pos, controller=None):
         super().__init__()
         self.setPos(pos)
 
-        # Visual composition: a colored background square and an icon pixmap on top
+        # Visual composition: a colored background square and an icon pixmap on
+        # top, drawn by paint() itself rather than by child items
         self._icon_pixmap = None
-        self._pixmap_item = None
-        self._background = None
 
-        # Load bundled icon
+        # Load bundled icon (once per icon file)
         try:
-            icon_path = Path(__file__).resolve().parent / self.ICON_FILE
-            pix = QPixmap(str(icon_path))
+            pix = BaseDevice._PIXMAP_CACHE.get(self.ICON_FILE)
+            if pix is None:
+                icon_path = Path(__file__).resolve().parent / self.ICON_FILE
+                pix = QPixmap(str(icon_path))
+                BaseDevice._PIXMAP_CACHE[self.ICON_FILE] = pix
             if not pix.isNull():
                 self._icon_pixmap = pix
         except Exception:
@@ -30,25 +59,26 @@ class BaseDevice(QGraphicsItem):
         # Default padding around the icon so background is a bit larger
         self._pad = 10  # pixels per side
 
-        # Create background rect and pixmap item if we have an icon
+        self._bg_brush = QBrush(QColor(255, 0, 0))
+        self._bg_pen = QPen(Qt.PenStyle.NoPen)
         if self._icon_pixmap is not None:
             w = self._icon_pixmap.width()
             h = self._icon_pixmap.height()
-            # background rect centered at (0,0)
-            rect = QRectF(-w/2 - self._pad, -h/2 - self._pad, w + 2 * self._pad, h + 2 * self._pad)
-            self._background = QGraphicsRectItem(rect, parent=self)
-            self._background.setBrush(QBrush(QColor(255, 0, 0)))
-            self._background.setPen(QPen(Qt.PenStyle.NoPen))
-            self._background.setZValue(0)
-
-            # Pixmap item centered
-            self._pixmap_item = QGraphicsPixmapItem(self._icon_pixmap, parent=self)
-            self._pixmap_item.setOffset(-w/2, -h/2)
-            self._pixmap_item.setZValue(1)
+            # background rect and icon centered at (0,0)
+            self._bg_rect = QRectF(-w/2 - self._pad, -h/2 - self._pad, w + 2 * self._pad, h + 2 * self._pad)
+            self._pix_offset = QPointF(-w/2, -h/2)
         else:
-            # Fall back to small bbox
+            # Fall back to small bbox; nothing is drawn but the labels
             self._pad = 5
-            self._background = None
+            self._bg_rect = None
+            self._pix_offset = None
+
+        # Qt asks for the geometry on every repaint, hit test and index update, so
+        # it is kept rather than rebuilt: the shape (the device square) never
+        # changes, the bounding rect only with the labels or outline (_invalidate_geometry)
+        self._cached_bounding_rect = self._compute_bounding_rect()
+        self._cached_shape = QPainterPath()
+        self._cached_shape.addRect(self._cached_bounding_rect)
 
         # Generic device properties
         self.model = ""
@@ -60,93 +90,47 @@ class BaseDevice(QGraphicsItem):
         self.serial_number = ""
         self.qr_data = ""
         self.brand = ""
+        # Search strings built by the controller; None when stale
+        self._search_cache = None
+        # ((bus, group, address), parsed keys) cached by the controller
+        self._address_keys = None
+
+        # (bus, group, address, room) last shown by update_address_label
+        self._last_label_key = None
+        # Manual lines ({'start', 'end'} dicts) ending at this device; kept by the controller
+        self.attached_lines = []
 
         # Reference to the controller (FloorPlanController) for callbacks
         self.controller = controller
 
-        # Range circle (gray area) - only for detectors
-        self.range_circle = None
-        # Room label (above) and Address label (below) shown near device
-        try:
-            # Room label (shows `room_id` when present)
-            self.room_label = QGraphicsTextItem("", parent=self)
-            self.room_label.setDefaultTextColor(QColor(0, 0, 0))
-            self.room_label.setZValue(3)
-            try:
-                rf = self.room_label.font()
-                rsize = rf.pointSizeF()
-                if not rsize or rsize <= 0:
-                    rsize = 8.0
-                rf.setPointSizeF(rsize * 2.0)
-                self.room_label.setFont(rf)
-            except Exception:
-                pass
-            try:
-                # Position room label above the icon (offset depends on icon height)
-                y_off = - (self._icon_pixmap.height() / 2 + 80) if self._icon_pixmap else -20
-                self.room_label.setPos(-64, y_off)
-            except Exception:
-                pass
-
-            # Background rect for the room label to improve readability on busy floorplans
-            try:
-                self.room_label_bg = QGraphicsRectItem(parent=self)
-                self.room_label_bg.setBrush(QBrush(QColor(240, 240, 240, 230)))
-                self.room_label_bg.setPen(QPen(Qt.PenStyle.NoPen))
-                # sit just below the label
-                self.room_label_bg.setZValue(2.5)
-                self.room_label_bg.setVisible(False)
-            except Exception:
-                self.room_label_bg = None
-
-            # Address label shown below room label
-            self.address_label = QGraphicsTextItem("", parent=self)
-            self.address_label.setDefaultTextColor(QColor(0, 0, 0))
-            self.address_label.setZValue(3)
-            # Make the label at least 2x the default text size (fall back to a sensible size)
-            try:
-                f = self.address_label.font()
-                size = f.pointSizeF()
-                if not size or size <= 0:
-                    # some environments may return -1; choose a reasonable default base size
-                    size = 8.0
-                f.setPointSizeF(size * 3.0)
-                self.address_label.setFont(f)
-            except Exception:
-                # if anything goes wrong, try a fixed larger font
-                try:
-                    f2 = QFont()
-                    f2.setPointSizeF(14.0)
-                    self.address_label.setFont(f2)
-                except Exception:
-                    pass
-
-            # position offset relative to device
-            try:
-                y_off = - (self._icon_pixmap.height() / 2 + 60) if self._icon_pixmap else -6
-                self.address_label.setPos(-64, y_off)
-            except Exception:
-                pass
-
-            # Background rect for the address label
-            try:
-                self.address_label_bg = QGraphicsRectItem(parent=self)
-                self.address_label_bg.setBrush(QBrush(QColor(240, 240, 240, 230)))
-                self.address_label_bg.setPen(QPen(Qt.PenStyle.NoPen))
-                self.address_label_bg.setZValue(2.5)
-                self.address_label_bg.setVisible(False)
-            except Exception:
-                self.address_label_bg = None
-        except Exception:
-            self.room_label = None
-            self.address_label = None
+        # Range radius in scene pixels; drawn by the controller's range overlay
+        self._range_px = None
+        # Room label (above) and address label (below) shown near the device.
+        # paint() draws them as QStaticText; a QGraphicsTextItem child each
+        # carried a whole QTextDocument for a few characters.
+        self._room_font, self._addr_font = self._label_fonts()
+        self._room_static = self._new_label_text()
+        self._addr_static = self._new_label_text()
+        # Top-left corners of the texts (offsets depend on icon height)
+        half_h = self._icon_pixmap.height() / 2 if self._icon_pixmap else None
+        self._room_pos = QPointF(-60, -(half_h + 76) if half_h is not None else -16)
+        self._addr_pos = QPointF(-60, -(half_h + 56) if half_h is not None else -2)
+        # Label background rects; None while a label is hidden
+        self._room_bg = None
+        self._addr_bg = None
 
         self.setAcceptHoverEvents(True)
+        # The look only changes with the colour or the labels; repaints are blits otherwise
+        self.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+        # Needed so paint() receives the exposed rect for culling
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
+        # Required for itemChange to receive position changes (lines/arrows follow moves)
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsGeometryChanges)
 
-    def boundingRect(self):
-        """Return the bounding rectangle for this device item."""
+    def _compute_bounding_rect(self):
+        """Return the device rectangle from the icon size and padding."""
         if self._icon_pixmap is not None:
             w = self._icon_pixmap.width()
             h = self._icon_pixmap.height()
@@ -154,10 +138,120 @@ class BaseDevice(QGraphicsItem):
         else:
             return QRectF(-8, -8, 16, 16)
 
+    def _invalidate_geometry(self):
+        """Recompute the bounding rect (device square, its outline and visible labels) and repaint."""
+        rect = self._compute_bounding_rect()
+        if self._bg_rect is not None and self._bg_pen.style() != Qt.PenStyle.NoPen:
+            # Half of the outline lies outside the square
+            m = max(self._bg_pen.widthF(), 1.0) / 2
+            rect = rect.adjusted(-m, -m, m, m)
+        for bg in (self._room_bg, self._addr_bg):
+            if bg is not None:
+                rect = rect.united(bg)
+        if rect != self._cached_bounding_rect:
+            self.prepareGeometryChange()
+            self._cached_bounding_rect = rect
+        self.update()
+
+    @classmethod
+    def _label_fonts(cls):
+        """Return the (room, address) label fonts, 2x and 3x the default size.
+
+        Sizes are fixed in pixels as resolved on the screen, so labels keep their
+        size relative to the plan on any paint device (a point-sized font would
+        grow with the resolution of a PDF writer). Built once and shared.
+        """
+        if BaseDevice._LABEL_FONTS is None:
+            base_size = QFont().pointSizeF()
+            if not base_size or base_size <= 0:
+                # some environments may return -1; choose a reasonable default base size
+                base_size = 8.0
+            fonts = []
+            for factor in (2.0, 3.0):
+                font = QFont()
+                font.setPointSizeF(base_size * factor)
+                font.setPixelSize(QFontInfo(font).pixelSize())
+                fonts.append(font)
+            BaseDevice._LABEL_FONTS = tuple(fonts)
+        return BaseDevice._LABEL_FONTS
+
+    @staticmethod
+    def _new_label_text():
+        """Return an empty QStaticText for a label (plain text, never markup)."""
+        text = QStaticText()
+        text.setTextFormat(Qt.TextFormat.PlainText)
+        return text
+
+    @staticmethod
+    def _set_label(static, font, pos, text):
+        """Show `text` in a label drawn at `pos`; return its background rect, or None if empty."""
+        if not text:
+            static.setText("")
+            return None
+        if static.text() != text:
+            static.setText(text)
+            static.prepare(QTransform(), font)
+        size = static.size()
+        pad = _LABEL_MARGIN + _LABEL_PAD
+        return QRectF(pos.x() - pad, pos.y() - pad, size.width() + 2 * pad, size.height() + 2 * pad)
+
+    def boundingRect(self):
+        """Return the bounding rectangle for this device item."""
+        return self._cached_bounding_rect
+
+    def shape(self):
+        """Return the hit-test shape (the bounding rectangle)."""
+        return self._cached_shape
+
     def paint(self, painter, option, widget):
-        """Paint method - child items (background rect and pixmap) handle the actual drawing."""
-        # Nothing to paint at this level; child items handle drawing
-        pass
+        """Paint the background square, the icon and the labels that intersect the exposed area."""
+        exposed = option.exposedRect
+        if exposed.isEmpty() or not exposed.intersects(self._cached_bounding_rect):
+            return
+        if self._bg_rect is not None:
+            painter.setPen(self._bg_pen)
+            painter.setBrush(self._bg_brush)
+            painter.drawRect(self._bg_rect)
+            painter.drawPixmap(self._pix_offset, self._icon_pixmap)
+        if self._room_bg is None and self._addr_bg is None:
+            return
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(_LABEL_BG_BRUSH)
+        for bg in (self._room_bg, self._addr_bg):
+            if bg is not None:
+                painter.drawRect(bg)
+        painter.setPen(_LABEL_TEXT_COLOR)
+        if self._room_bg is not None:
+            painter.setFont(self._room_font)
+            painter.drawStaticText(self._room_pos, self._room_static)
+        if self._addr_bg is not None:
+            painter.setFont(self._addr_font)
+            painter.drawStaticText(self._addr_pos, self._addr_static)
+
+    def paint_for_export(self, painter):
+        """Paint the device onto an export painter; this just calls paint() with the whole item exposed.
+
+        The painter must already map this item's coordinates. The labels and
+        background are part of paint(), so there are no child items to draw.
+        """
+        option = QStyleOptionGraphicsItem()
+        option.exposedRect = self.boundingRect()
+        self.paint(painter, option, None)
+
+    def export_fingerprint(self):
+        """Return a tuple describing everything paint_for_export draws (plus the range).
+
+        Equal tuples mean an identical export rendering, which lets the
+        controller reuse a previous render of the plan.
+        """
+        p = self.pos()
+        parts = [p.x(), p.y(), self.isVisible(), self._range_px]
+        if self._bg_rect is not None:
+            brush = self._bg_brush
+            pen = self._bg_pen
+            parts += [brush.style(), brush.color().rgba(), pen.style(), pen.color().rgba(), pen.widthF()]
+        parts += [self._room_static.text(), self._addr_static.text()]
+        return tuple(parts)
 
     def itemChange(self, change, value):
         """Respond to position changes so controller can update dependent visuals.
@@ -171,17 +265,21 @@ class BaseDevice(QGraphicsItem):
                 if self.controller is not None:
                     # update manual lines (if controller tracks them)
                     try:
-                        for line in getattr(self.controller, 'lines', []):
-                            if line.get('start') is self or line.get('end') is self:
-                                s_pos = line['start'].pos()
-                                e_pos = line['end'].pos()
-                                line['item'].setLine(s_pos.x(), s_pos.y(), e_pos.x(), e_pos.y())
+                        if hasattr(self.controller, 'update_lines_for_detector'):
+                            self.controller.update_lines_for_detector(self)
                     except Exception:
                         pass
-                    # update auto arrows if controller supports it
+                    # keep the range circle with the detector
                     try:
-                        if hasattr(self.controller, 'update_address_arrows'):
-                            self.controller.update_address_arrows()
+                        if self._range_px and hasattr(self.controller, 'update_detector_range_overlay'):
+                            self.controller.update_detector_range_overlay(self)
+                    except Exception:
+                        pass
+                    # update auto arrows if controller supports it (once per event-loop
+                    # pass, not on every step of a drag)
+                    try:
+                        if hasattr(self.controller, 'schedule_address_arrows'):
+                            self.controller.schedule_address_arrows()
                     except Exception:
                         pass
         except Exception:
@@ -224,6 +322,17 @@ class BaseDevice(QGraphicsItem):
             except Exception:
                 pass
 
+    def mouseReleaseEvent(self, event):
+        """Finish a drag: line ends skipped as sub-pixel moves are brought up to date."""
+        super().mouseReleaseEvent(event)
+        try:
+            if self.controller is not None and hasattr(self.controller, 'sync_lines_path'):
+                scene = self.scene()
+                moved = scene.selectedItems() if scene is not None else []
+                self.controller.sync_lines_path(moved if self in moved else moved + [self])
+        except Exception:
+            pass
+
     def mouseDoubleClickEvent(self, event):
         """Open the device properties dialog on double click."""
         try:
@@ -259,88 +368,22 @@ class BaseDevice(QGraphicsItem):
         bus, group and address are available.
         """
         try:
-            if not getattr(self, 'address_label', None):
-                return
             bus = str(getattr(self, 'bus_number', '') or '').strip()
             group = str(getattr(self, 'group', '') or '').strip()
             addr = str(getattr(self, 'address', '') or '').strip()
             room = str(getattr(self, 'room_id', '') or '').strip()
+            # Nothing to do if the fields shown are unchanged since the last update
+            key = (bus, group, addr, room)
+            if key == self._last_label_key:
+                return
+            self._last_label_key = key
 
-            # Update room label first
-            try:
-                if getattr(self, 'room_label', None):
-                    if room:
-                        self.room_label.setPlainText(room)
-                        self.room_label.setVisible(True)
-                        # update background rect for room label
-                        try:
-                            if getattr(self, 'room_label_bg', None):
-                                br = self.room_label.boundingRect()
-                                pad = 4
-                                x = self.room_label.pos().x() + br.x() - pad
-                                y = self.room_label.pos().y() + br.y() - pad
-                                w = br.width() + pad * 2
-                                h = br.height() + pad * 2
-                                self.room_label_bg.setRect(x, y, w, h)
-                                self.room_label_bg.setVisible(True)
-                        except Exception:
-                            pass
-                    else:
-                        self.room_label.setPlainText("")
-                        self.room_label.setVisible(False)
-                        try:
-                            if getattr(self, 'room_label_bg', None):
-                                self.room_label_bg.setVisible(False)
-                        except Exception:
-                            pass
-            except Exception:
-                pass
-
-            if bus and group and addr:
-                # Prefer numeric formatting: bus -> 2 digits, group -> as-is (single digit), address -> 3 digits
-                try:
-                    bus_i = int(bus)
-                    group_i = int(group)
-                    addr_i = int(addr)
-                    label = f"{bus_i:02d}-{group_i}{addr_i:03d}"
-                except Exception:
-                    # fallback to raw concatenation if values aren't numeric
-                    label = f"{bus}-{group}{addr}"
-                try:
-                    if getattr(self, 'address_label', None):
-                        self.address_label.setPlainText(label)
-                        self.address_label.setVisible(True)
-                        # update background rect for address label
-                        try:
-                            if getattr(self, 'address_label_bg', None):
-                                br = self.address_label.boundingRect()
-                                pad = 4
-                                x = self.address_label.pos().x() + br.x() - pad
-                                y = self.address_label.pos().y() + br.y() - pad
-                                w = br.width() + pad * 2
-                                h = br.height() + pad * 2
-                                self.address_label_bg.setRect(x, y, w, h)
-                                self.address_label_bg.setVisible(True)
-                        except Exception:
-                            pass
-                except Exception:
-                    pass
-            else:
-                # hide if incomplete
-                try:
-                    if getattr(self, 'address_label', None):
-                        self.address_label.setPlainText("")
-                        self.address_label.setVisible(False)
-                        try:
-                            if getattr(self, 'address_label_bg', None):
-                                self.address_label_bg.setVisible(False)
-                        except Exception:
-                            pass
-                except Exception:
-                    pass
-                
+            self._room_bg = self._set_label(self._room_static, self._room_font, self._room_pos, room)
+            self._addr_bg = self._set_label(self._addr_static, self._addr_font, self._addr_pos,
+                                            self.get_full_address_label())
+            self._invalidate_geometry()
         except Exception:
-                    pass
+            pass
 
     def get_full_address_label(self):
         """Return the formatted full address label (same format used for display) or empty string."""
@@ -363,40 +406,22 @@ class BaseDevice(QGraphicsItem):
     # Compatibility helpers so controller code that calls setBrush/setPen continues to work
     def setBrush(self, brush):
         """Set the brush (background color) of the device."""
-        try:
-            if self._background is not None:
-                self._background.setBrush(brush)
-            else:
-                # no background; no-op
-                pass
-        except Exception:
-            pass
+        self._bg_brush = QBrush(brush)
+        self.update()
 
     def brush(self):
         """Return the current brush of the background rectangle."""
-        try:
-            if self._background is not None:
-                return self._background.brush()
-        except Exception:
-            pass
-        return QBrush()
+        return QBrush(self._bg_brush)
 
     def setPen(self, pen):
         """Set the pen (border) of the device background."""
-        try:
-            if self._background is not None:
-                self._background.setPen(pen)
-        except Exception:
-            pass
+        self._bg_pen = QPen(pen)
+        # A wider outline changes the bounding rect
+        self._invalidate_geometry()
 
     def pen(self):
         """Return the current pen of the background rectangle."""
-        try:
-            if self._background is not None:
-                return self._background.pen()
-        except Exception:
-            pass
-        return QPen()
+        return QPen(self._bg_pen)
 
 
 class SmokeDetector(BaseDevice):
@@ -418,39 +443,16 @@ class SmokeDetector(BaseDevice):
         self.range = range_meters
         # If no pixels_per_meter provided, don't draw the range circle (requires calibration)
         if pixels_per_meter is None:
-            if self.range_circle:
-                try:
-                    self.scene().removeItem(self.range_circle)
-                except Exception:
-                    pass
-                self.range_circle = None
-            return
-
-        range_pixels = range_meters * pixels_per_meter
-
-        if self.range_circle:
-            try:
-                self.scene().removeItem(self.range_circle)
-            except Exception:
-                pass
-
-        # Create a child ellipse item to represent the range
-        from PyQt6.QtWidgets import QGraphicsEllipseItem
-
-        self.range_circle = QGraphicsEllipseItem(
-            -range_pixels, -range_pixels,
-            range_pixels * 2, range_pixels * 2,
-            parent=self
-        )
-        self.range_circle.setBrush(QBrush(QColor(128, 128, 128, 64)))  # Semi-transparent gray
-        self.range_circle.setPen(QPen(Qt.PenStyle.NoPen))
-        self.range_circle.setZValue(-1)  # Place behind the detector dot
-        # Respect controller-level visibility flag if present
+            self._range_px = None
+        else:
+            self._range_px = range_meters * pixels_per_meter
         try:
-            visible = getattr(self.controller, 'show_ranges', True)
-            self.range_circle.setVisible(bool(visible))
+            if self.controller is not None and hasattr(self.controller, 'update_detector_range_overlay'):
+                self.controller.update_detector_range_overlay(self)
         except Exception:
             pass
+        if pixels_per_meter is None:
+            return
 
         # Ensure address label is updated when range is (re)created
         try:
@@ -0,0 +1,232 @@
+"""Geometry helpers for detector layout checks."""
+import math
+import threading
+
+import numpy as np
+
+try:
+    # Numba is optional; when it is missing the NumPy implementation is used
+    from numba import njit, prange, get_num_threads
+except ImportError:
+    njit = None
+    prange = range
+    get_num_threads = None
+
+
+def _close_pairs_kernel(xs, ys, scale, thresh):
+    """Sweep points sorted by x and return index pairs closer than `thresh` meters.
+
+    `xs` must be sorted ascending, so the inner loop stops at the first point
+    that is `thresh` or more to the right: only points inside the x window are
+    compared, which keeps typical floor plans far below N x N work. Runs in two
+    passes (count, then fill) so parallel rows never write to a shared growing
+    list. Distances are compared squared, in pixels, so no sqrt is taken.
+    """
+    n = xs.shape[0]
+    thresh_pix_sq = (thresh / scale) ** 2
+    counts = np.zeros(n, dtype=np.int64)
+    for i in prange(n):
+        xi = xs[i]
+        yi = ys[i]
+        c = 0
+        for j in range(i + 1, n):
+            dx = xs[j] - xi
+            if dx * dx >= thresh_pix_sq:
+                break
+            dy = ys[j] - yi
+            if dx * dx + dy * dy < thresh_pix_sq:
+                c += 1
+        counts[i] = c
+
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    for i in range(n):
+        offsets[i + 1] = offsets[i] + counts[i]
+
+    out_i = np.empty(offsets[n], dtype=np.int64)
+    out_j = np.empty(offsets[n], dtype=np.int64)
+    for i in prange(n):
+        xi = xs[i]
+        yi = ys[i]
+        k = offsets[i]
+        for j in range(i + 1, n):
+            dx = xs[j] - xi
+            if dx * dx >= thresh_pix_sq:
+                break
+            dy = ys[j] - yi
+            if dx * dx + dy * dy < thresh_pix_sq:
+                out_i[k] = i
+                out_j[k] = j
+                k += 1
+    return out_i, out_j
+
+
+if njit is not None:
+    _close_pairs_jit = njit(parallel=True, cache=True, fastmath=True)(_close_pairs_kernel)
+else:
+    _close_pairs_jit = None
+
+
+def _close_pairs_numpy(xs, ys, scale, thresh):
+    """NumPy fallback of the sweep: `xs` sorted ascending.
+
+    Compares every point with its k-th right neighbour for k = 1, 2, ... while
+    that neighbour is still inside the x window, so the work is proportional to
+    the number of candidate pairs rather than N x N.
+    """
+    n = xs.shape[0]
+    thresh_pix = thresh / scale
+    thresh_pix_sq = thresh_pix ** 2
+    # First index past each point's x window (inclusive bound; the exact test below filters)
+    span = np.searchsorted(xs, xs + thresh_pix, side='right') - np.arange(n) - 1
+    active = np.nonzero(span > 0)[0]
+    found_i = []
+    found_j = []
+    k = 1
+    while active.size:
+        dx = xs[active + k] - xs[active]
+        dy = ys[active + k] - ys[active]
+        hit = active[dx * dx + dy * dy < thresh_pix_sq]
+        found_i.append(hit)
+        found_j.append(hit + k)
+        k += 1
+        active = active[span[active] >= k]
+    if not found_i:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(found_i).astype(np.int64), np.concatenate(found_j).astype(np.int64)
+
+
+def close_pairs(xs, ys, scale, thresh=0.5):
+    """Return index arrays (i, j), i < j, of points closer than `thresh` meters.
+
+    Args:
+        xs: x coordinates in pixels
+        ys: y coordinates in pixels
+        scale: meters per pixel
+        thresh: distance threshold in meters
+
+    Returns:
+        Tuple of two int64 arrays ordered by i, then j
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    # Sweep in x order, then map the pairs back to the caller's indices
+    order = np.argsort(xs, kind='stable')
+    sx = np.ascontiguousarray(xs[order])
+    sy = np.ascontiguousarray(ys[order])
+    if _close_pairs_jit is not None:
+        a, b = _close_pairs_jit(sx, sy, float(scale), float(thresh))
+    else:
+        a, b = _close_pairs_numpy(sx, sy, float(scale), float(thresh))
+    a = order[a]
+    b = order[b]
+    i = np.minimum(a, b)
+    j = np.maximum(a, b)
+    keep = np.lexsort((j, i))
+    return i[keep].astype(np.int64), j[keep].astype(np.int64)
+
+
+def _arrow_heads_kernel(start, end, length, half_width):
+    """Return the two base corners (x2, y2, x3, y3) of each arrow head.
+
+    The tip is at `end`; the base lies `length` back along the arrow and is
+    `2 * half_width` wide. Zero-length arrows point along +x.
+    """
+    n = start.shape[0]
+    out = np.empty((n, 4))
+    for k in range(n):
+        dx = end[k, 0] - start[k, 0]
+        dy = end[k, 1] - start[k, 1]
+        d = math.sqrt(dx * dx + dy * dy)
+        if d > 0.0:
+            c = dx / d
+            s = dy / d
+        else:
+            c = 1.0
+            s = 0.0
+        bx = end[k, 0] - length * c
+        by = end[k, 1] - length * s
+        out[k, 0] = bx + half_width * s
+        out[k, 1] = by - half_width * c
+        out[k, 2] = bx - half_width * s
+        out[k, 3] = by + half_width * c
+    return out
+
+
+if njit is not None:
+    # Compiled (or loaded from the on-disk cache) on the first call, not at import;
+    # warm_up() makes that first call early
+    _arrow_heads_jit = njit(cache=True, fastmath=True)(_arrow_heads_kernel)
+else:
+    _arrow_heads_jit = None
+
+
+def arrow_heads(start, end, length, half_width):
+    """Return an (N, 4) array with the base corners (x2, y2, x3, y3) of N arrow heads.
+
+    Args:
+        start: (N, 2) array of arrow start points
+        end: (N, 2) array of arrow end points (the tips)
+        length: head length along the arrow
+        half_width: half the width of the head base
+    """
+    start = np.ascontiguousarray(start, dtype=np.float64).reshape(-1, 2)
+    end = np.ascontiguousarray(end, dtype=np.float64).reshape(-1, 2)
+    if _arrow_heads_jit is not None:
+        return _arrow_heads_jit(start, end, float(length), float(half_width))
+    d = end - start
+    norm = np.hypot(d[:, 0], d[:, 1])
+    zero = norm == 0
+    norm[zero] = 1.0
+    c = np.where(zero, 1.0, d[:, 0] / norm)
+    s = d[:, 1] / norm
+    bx = end[:, 0] - length * c
+    by = end[:, 1] - length * s
+    return np.column_stack((bx + half_width * s, by - half_width * c, bx - half_width * s, by + half_width * c))
+
+
+def warm_up():
+    """Compile (or load from cache) the JIT kernels so the first validation and arrows are fast."""
+    try:
+        close_pairs(np.zeros(4), np.zeros(4), 1.0, 0.5)
+        arrow_heads(np.zeros((1, 2)), np.ones((1, 2)), 16.0, 8.0)
+    except Exception:
+        pass
+
+
+def warm_up_async():
+    """Run warm_up() in a daemon thread and return the thread.
+
+    A cold compile takes over a second; Numba releases the GIL meanwhile, so
+    the UI stays responsive. Numba's thread pool is started here, on the
+    calling thread, first: compiling the parallel kernel would otherwise start
+    it in the worker, and a TBB pool started from a short-lived thread hangs
+    the interpreter at exit.
+    """
+    if get_num_threads is not None:
+        get_num_threads()
+    thread = threading.Thread(target=warm_up, name="jit-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def pairwise_hypot(p1, p2):
+    """Return the distances between matching rows of two point arrays.
+
+    Args:
+        p1: (N, 2) array of points
+        p2: (N, 2) array of points
+
+    Returns:
+        (N,) float64 array with the distance between p1[k] and p2[k]
+    """
+    p1 = np.asarray(p1, dtype=np.float64).reshape(-1, 2)
+    p2 = np.asarray(p2, dtype=np.float64).reshape(-1, 2)
+    return np.hypot(p2[:, 0] - p1[:, 0], p2[:, 1] - p1[:, 1])
+
+
+def perp_unit(dx, dy):
+    """Return the unit normal (-dy, dx) / length of a direction, or (0, -1) if it is zero."""
+    length = math.hypot(dx, dy)
+    if length > 0:
+        return -dy / length, dx / length
+    return 0.0, -1.0
@@ -0,0 +1,303 @@
+"""Helpers for building the detector report PDF."""
+import io
+import multiprocessing
+import operator
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas as pdfcanvas
+from reportlab.platypus import SimpleDocTemplate, LongTable, TableStyle, Spacer, Paragraph, PageBreak, Flowable
+
+# Reports with fewer table rows than this are built serially; below it the
+# worker start-up (a fresh interpreter importing ReportLab) costs more than
+# the parallel table layout saves.
+PARALLEL_MIN_ROWS = 5000
+
+# Deflate level for the report's streams. Level 1 is several times faster than
+# zlib's default (6) on the raster floor plan and only slightly larger.
+DEFLATE_LEVEL = 1
+
+# Detector table with columns: Full address label, Serial number, Room ID, QR data, Paired Detector SN, Type.
+# Built once and shared by every bus table.
+BUS_HEADER = ['Full\naddress', 'Serial number', 'Room ID', 'QR data', 'Paired\nDetector SN', 'Type']
+
+# Column widths: allocate space to QR data and Paired SN where Bus/Group/Address used to be
+BUS_COL_WIDTHS = [2*cm, 4.5*cm, 3*cm, 8*cm, 3.5*cm, 2*cm]
+
+# Wrapping is decided by the cell type, not the style: Table has no WORDWRAP
+# command, plain string cells are only split on newlines (no width measuring),
+# and only flowable cells go through the wrap path. Every column except QR data
+# therefore stays a plain string (see row_cells / qr_cell).
+BUS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('ALIGN', (0, 0), (1, -1), 'CENTER'),
+    ('ALIGN', (2, 0), (2, -1), 'CENTER'),
+    ('ALIGN', (4, 0), (4, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+
+# Paragraph styles, looked up (or derived) once instead of per report
+_STYLES = getSampleStyleSheet()
+NORMAL_STYLE = _STYLES['Normal']
+_HEADING2_STYLE = _STYLES['Heading2']
+TITLE_STYLE = ParagraphStyle('CustomTitle', parent=_STYLES['Heading1'], fontSize=32, spaceAfter=20)
+DATE_STYLE = ParagraphStyle('DateStyle', parent=NORMAL_STYLE, fontSize=10, textColor=colors.gray)
+
+# Spacers carry no per-use state during layout, so one instance is shared by
+# every bus: the gap below the bus heading and the gap between sub-tables.
+BUS_HEADING_SPACER = Spacer(1, 10)
+_SUBTABLE_SPACER = Spacer(1, 2)
+
+# Escapes QR text for Paragraph markup and turns newlines into line breaks in one pass
+_QR_TRANSLATE = str.maketrans({'\n': '<br />', '&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+# Usable width of the QR data column (default cell padding is 6 pt per side)
+_QR_TEXT_WIDTH = BUS_COL_WIDTHS[3] - 12
+
+
+def qr_cell(qr):
+    """Return the bus table cell for a QR data string.
+
+    Values whose lines all fit the column are returned as plain strings,
+    which the table lays out itself, one line per newline (no markup
+    parsing, so no escaping); anything that needs wrapping gets a Paragraph
+    with the text escaped.
+    """
+    if all(stringWidth(line, 'Helvetica', 10) <= _QR_TEXT_WIDTH for line in qr.split('\n')):
+        return qr
+    return _qr_para(qr)
+
+
+@lru_cache(maxsize=4096)
+def _qr_para(qr):
+    # Devices often share QR text; the Paragraph is only ever wrapped at the QR
+    # column width, so one instance (and its wrap result) can serve every row.
+    return Paragraph(qr.translate(_QR_TRANSLATE), NORMAL_STYLE)
+
+
+def warm_up():
+    """Load what the first export would otherwise load on demand.
+
+    Importing this module already pulls in the ReportLab modules it uses;
+    this also imports the ones export_to_pdf imports itself and loads the
+    Helvetica metrics and the shared styles' fonts.
+    """
+    import reportlab.lib.pagesizes  # noqa: F401
+    import reportlab.pdfbase.ttfonts  # noqa: F401
+    for font in ('Helvetica', 'Helvetica-Bold'):
+        stringWidth('0', font, 10)
+    Paragraph('Bus', _HEADING2_STYLE).wrap(100, 100)
+
+
+class _FastZlib:
+    """Stand-in for the zlib module inside reportlab.pdfbase.pdfdoc."""
+    decompress = staticmethod(zlib.decompress)
+
+    @staticmethod
+    def compress(data, level=DEFLATE_LEVEL):
+        return zlib.compress(data, level)
+
+
+@contextmanager
+def fast_streams():
+    """Make ReportLab write page and image streams cheaply while active.
+
+    Streams are deflated at DEFLATE_LEVEL: ReportLab has no setting for the
+    level and pdfdoc calls zlib.compress() with the default, so its module
+    reference is swapped. They are also written as binary instead of being
+    ASCII85-encoded (rl_config.useA85), which ReportLab does in pure Python
+    over every byte, including the raster floor plan, and which makes the
+    streams a quarter larger.
+    """
+    from reportlab import rl_config
+    from reportlab.pdfbase import pdfdoc
+    saved = pdfdoc.zlib, rl_config.useA85
+    pdfdoc.zlib = _FastZlib
+    rl_config.useA85 = 0
+    try:
+        yield
+    finally:
+        pdfdoc.zlib, rl_config.useA85 = saved
+
+
+class ReservedArea(Flowable):
+    """Empty, centered box of a fixed size that records where it was placed.
+
+    Leaves room for content stamped onto the page after the build (see
+    stamp_page); `placed` is (page number, x, y) of its bottom-left corner
+    in points once the document has been built.
+    """
+
+    def __init__(self, width, height):
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.hAlign = 'CENTER'
+        self.placed = None
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def drawOn(self, canvas, x, y, _sW=0):
+        # draw() only sees a translated canvas, so the position is taken here
+        self.placed = (canvas.getPageNumber(), self._hAlignAdjust(x, _sW), y)
+        super().drawOn(canvas, x, y, _sW)
+
+    def draw(self):
+        pass
+
+
+def stamp_page(file_path, page_number, overlay):
+    """Draw the first page of PDF bytes `overlay` over page `page_number` (1-based) of `file_path`.
+
+    The overlay is placed at the page's top-left corner at its own size. The
+    file is updated with an incremental save, so the rest of the document is
+    neither re-parsed nor rewritten.
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path) as doc, fitz.open('pdf', overlay) as src:
+        w, h = src[0].rect.width, src[0].rect.height
+        doc[page_number - 1].show_pdf_page(fitz.Rect(0, 0, w, h), src, 0)
+        doc.saveIncr()
+
+
+# Device fields read for each row; BaseDevice provides class-level defaults
+_ROW_ATTRS = operator.attrgetter('serial_number', 'room_id', 'qr_data', 'device_type')
+
+
+def row_values(d):
+    """Return the plain (picklable) field values of device `d`'s table row."""
+    sn, room, qr, dtype = _ROW_ATTRS(d)
+    # get_full_address_label never raises; paired_sn only exists on detectors
+    return (d.get_full_address_label(), sn, room, qr or '', getattr(d, 'paired_sn', ''), dtype)
+
+
+def row_cells(values):
+    """Turn row values from row_values() into table cells."""
+    label, sn, room, qr, paired, dtype = values
+    return [label, sn, room, qr_cell(qr), paired, dtype]
+
+
+def build_row(d):
+    """Return the bus table row for device `d`."""
+    return row_cells(row_values(d))
+
+
+def append_bus_section(story, bus_num, rows):
+    """Append one bus section (heading, tables, page break) to `story`."""
+    # Long buses are emitted as several bounded tables (ReportLab table layout is super-linear)
+    story.extend((
+        Paragraph(f"Bus {bus_num}", _HEADING2_STYLE),
+        BUS_HEADING_SPACER,
+        *bus_tables(rows, BUS_HEADER, BUS_COL_WIDTHS, BUS_TABLE_STYLE),
+        PageBreak(),
+    ))
+
+
+def bus_tables(rows, header, col_widths, style, max_rows=200):
+    """Yield the table for one bus as a run of bounded sub-tables.
+
+    ReportLab's table layout cost grows super-linearly with the row count, so
+    long buses are split every `max_rows` rows. Each sub-table repeats the
+    header and shares the same `style`; a small spacer separates them.
+
+    Args:
+        rows: table rows without the header
+        header: header row
+        col_widths: column widths in points
+        style: TableStyle applied to every sub-table
+        max_rows: maximum body rows per sub-table
+    """
+    for start in range(0, max(len(rows), 1), max_rows):
+        if start:
+            yield _SUBTABLE_SPACER
+        # LongTable splits across pages without re-measuring every row per split
+        table = LongTable([header] + rows[start:start + max_rows], colWidths=col_widths, repeatRows=1)
+        table.setStyle(style)
+        yield table
+
+
+def _render_bus_pdf(job):
+    """Worker: lay out one bus section as a standalone PDF and return its bytes."""
+    pagesize, bus_num, values = job
+    story = []
+    append_bus_section(story, bus_num, [row_cells(v) for v in values])
+    buf = io.BytesIO()
+    with fast_streams():
+        SimpleDocTemplate(buf, pagesize=pagesize).build(story)
+    return buf.getvalue()
+
+
+def build_parallel(file_path, pagesize, front_story, bus_jobs, footer):
+    """Build the report with the bus sections laid out in worker processes.
+
+    The front matter is built in this process, each bus section in its own
+    worker, and the parts are merged with pypdf. Page footers depend on the
+    final page numbers, so they are stamped onto the merged pages afterwards.
+
+    Args:
+        file_path: output PDF path
+        pagesize: page size shared by all parts
+        front_story: flowables preceding the bus sections
+        bus_jobs: list of (bus_num, [row_values(...), ...]) in output order
+        footer: callable(canvas, doc) drawing the footer for the current page
+
+    Returns:
+        False (nothing written) if pypdf is not installed or only one CPU is
+        available, True otherwise
+    """
+    workers = min(os.cpu_count() or 1, len(bus_jobs))
+    if workers < 2:
+        return False
+    try:
+        from pypdf import PdfReader, PdfWriter
+    except ImportError:
+        return False
+
+    buf = io.BytesIO()
+    with fast_streams():
+        SimpleDocTemplate(buf, pagesize=pagesize).build(front_story)
+    parts = [buf.getvalue()]
+    # Always spawn: forking a process that already runs Qt (and Numba) threads can
+    # deadlock the workers, and spawn is what Windows uses anyway.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as ex:
+        parts.extend(ex.map(_render_bus_pdf, [(pagesize, bus_num, values) for bus_num, values in bus_jobs]))
+
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(PdfReader(io.BytesIO(part)))
+
+    # Second pass: one overlay page per output page carrying its footer
+    overlay_buf = io.BytesIO()
+    overlay_canvas = pdfcanvas.Canvas(overlay_buf, pagesize=pagesize)
+    for _ in range(len(writer.pages)):
+        footer(overlay_canvas, None)
+        overlay_canvas.showPage()
+    with fast_streams():
+        overlay_canvas.save()
+    overlay = PdfReader(io.BytesIO(overlay_buf.getvalue()))
+    for page, stamp in zip(writer.pages, overlay.pages):
+        page.merge_page(stamp)
+        # merging leaves the page content uncompressed
+        page.compress_content_streams(level=DEFLATE_LEVEL)
+
+    with open(file_path, 'wb') as f:
+        writer.write(f)
+    return True
@@ -1,13 +1,96 @@
 """Utility functions for handling PDF files."""
 import fitz  # PyMuPDF
-import io
+import functools
+import os
+import numpy as np
+from collections import OrderedDict
 from typing import List, Tuple
-from PIL import Image
-from pathlib import Path
 
 
-def get_pdf_info(pdf_path: str) -> Tuple[int, List[Tuple[int, int]]]:
-    """Get page count and dimensions of a PDF file.
+# Standard paper sizes in millimeters (ISO A-series)
+PAPER_DIM_MM = {
+    "A0": (841, 1189),
+    "A1": (594, 841),
+    "A2": (420, 594),
+    "A3": (297, 420),
+    "A4": (210, 297),
+    "A5": (148, 210),
+}
+
+# The same sizes in PDF points (approx values at 72pt/in)
+PAPER_POINTS = {
+    "A0": (2384, 3370),
+    "A1": (1684, 2384),
+    "A2": (1191, 1684),
+    "A3": (842, 1191),
+    "A4": (595, 842),
+    "A5": (420, 595),
+}
+
+_PAPER_NAMES = np.array(list(PAPER_POINTS.keys()))
+_PAPER_WH = np.array(list(PAPER_POINTS.values()), dtype=np.float64)
+
+
+def classify_paper_sizes(sizes) -> List[str]:
+    """Name the ISO paper size of each (width, height) in points, either orientation.
+
+    Sizes within 5 points of a standard size match it; the others are named
+    "Unknown". All pages are compared with all paper sizes in one array
+    operation.
+    """
+    arr = np.asarray(sizes, dtype=np.float64).reshape(-1, 2)
+    if not len(arr):
+        return []
+    portrait = np.abs(arr[:, None, :] - _PAPER_WH[None, :, :]).max(2)
+    landscape = np.abs(arr[:, None, :] - _PAPER_WH[None, :, ::-1]).max(2)
+    hit = (portrait < 5) | (landscape < 5)
+    names = np.where(hit.any(1), _PAPER_NAMES[hit.argmax(1)], "Unknown")
+    return names.tolist()
+
+
+# Open documents by (path, modification time), most recently used last
+_PDF_CACHE: "OrderedDict[tuple, fitz.Document]" = OrderedDict()
+_PDF_CACHE_SIZE = 4
+
+
+def _open(pdf_path) -> fitz.Document:
+    """Return an open document for `pdf_path`, reusing a cached one.
+
+    Opening parses the cross-reference table, and a typical page selection
+    (info, preview, render) opens the same file several times. The cache owns
+    the documents: callers must not close them, but call close_cached() when
+    the flow is done. A file changed on disk gets a new key and is opened
+    again; its stale handle is closed.
+    """
+    pdf_path = str(pdf_path)
+    key = (pdf_path, os.path.getmtime(pdf_path))
+    doc = _PDF_CACHE.get(key)
+    if doc is None:
+        for stale in [k for k in _PDF_CACHE if k[0] == pdf_path]:
+            _PDF_CACHE.pop(stale).close()
+        doc = fitz.open(pdf_path)
+        _PDF_CACHE[key] = doc
+        while len(_PDF_CACHE) > _PDF_CACHE_SIZE:
+            _, old = _PDF_CACHE.popitem(last=False)
+            old.close()
+    else:
+        _PDF_CACHE.move_to_end(key)
+    return doc
+
+
+def close_cached():
+    """Close every document kept open by the cache, releasing the file handles.
+
+    Call when a PDF flow (page selection, floor-plan load) is done: on Windows
+    an open handle stops the user from replacing or re-saving the file.
+    """
+    while _PDF_CACHE:
+        _, doc = _PDF_CACHE.popitem()
+        doc.close()
+
+
+def get_pdf_info(pdf_path: str) -> Tuple[int, List[Tuple[int, int]], List[str]]:
+    """Get page count, dimensions and paper sizes of a PDF file.
     
     Args:
         pdf_path: Path to the PDF file
@@ -16,39 +99,12 @@ def get_pdf_info(pdf_path: str) -> Tuple[int, List[Tuple[int, int]]]:
         Tuple containing:
             - Number of pages
             - List of (width, height) tuples in pixels for each page
+            - List of paper size names (A0..A5 or "Unknown") for each page
     """
-    # Paper size mappings (in points)
-    PAPER_SIZES = {
-    "A0": (2384, 3370),
-    "A1": (1684, 2384),
-    "A2": (1191, 1684),
-    "A3": (842, 1191),
-    "A4": (595, 842),
-    "A5": (420, 595)
-    }
-    
-    doc = fitz.open(pdf_path)
-    try:
-        dims = []
-        for i, page in enumerate(doc):
-            rect = page.rect
-            width_px = int(rect.width)
-            height_px = int(rect.height)
-            dims.append((width_px, height_px))
-            
-            # Determine paper size
-            paper_size = "Unknown"
-            for size_name, (w, h) in PAPER_SIZES.items():
-                if (abs(rect.width - w) < 5 and abs(rect.height - h) < 5) or \
-                   (abs(rect.width - h) < 5 and abs(rect.height - w) < 5):
-                    paper_size = size_name
-                    break
-            
-            print(f"Page {i+1}: {width_px}x{height_px} pixels ({paper_size})")
-        
-        return len(doc), dims
-    finally:
-        doc.close()
+    doc = _open(pdf_path)
+    rects = [(page.rect.width, page.rect.height) for page in doc]
+    dims = [(int(w), int(h)) for w, h in rects]
+    return len(doc), dims, classify_paper_sizes(rects)
 
 
 def get_pdf_page_physical_size(pdf_path: str, page_num: int = 0):
@@ -65,47 +121,32 @@ def get_pdf_page_physical_size(pdf_path: str, page_num: int = 0):
     Returns:
         Tuple (width_m, height_m, paper_name) or (None, None, None)
     """
-    # Standard paper sizes in millimeters (ISO A-series)
-    PAPER_DIM_MM = {
-        "A0": (841, 1189),
-        "A1": (594, 841),
-        "A2": (420, 594),
-        "A3": (297, 420),
-        "A4": (210, 297),
-        "A5": (148, 210),
-    }
-
-    # Points mapping used earlier (approx values at 72pt/in)
-    PAPER_POINTS = {
-        "A0": (2384, 3370),
-        "A1": (1684, 2384),
-        "A2": (1191, 1684),
-        "A3": (842, 1191),
-        "A4": (595, 842),
-        "A5": (420, 595),
-    }
-
-    doc = fitz.open(pdf_path)
-    try:
-        if page_num < 0 or page_num >= len(doc):
-            return (None, None, None)
-        page = doc.load_page(page_num)
-        rect = page.rect
-        # rect.width and height are in PDF points
-        for name, (pw, ph) in PAPER_POINTS.items():
-            if (abs(rect.width - pw) < 5 and abs(rect.height - ph) < 5) or \
-               (abs(rect.width - ph) < 5 and abs(rect.height - pw) < 5):
-                mm_w, mm_h = PAPER_DIM_MM.get(name, (None, None))
-                if mm_w is None:
-                    return (None, None, None)
-                # Convert mm to meters
-                return (mm_w / 1000.0, mm_h / 1000.0, name)
+    doc = _open(pdf_path)
+    if page_num < 0 or page_num >= len(doc):
         return (None, None, None)
-    finally:
-        doc.close()
+    rect = doc.load_page(page_num).rect
+    # rect.width and height are in PDF points
+    name = classify_paper_sizes([(rect.width, rect.height)])[0]
+    mm_w, mm_h = PAPER_DIM_MM.get(name, (None, None))
+    if mm_w is None:
+        return (None, None, None)
+    # Convert mm to meters
+    return (mm_w / 1000.0, mm_h / 1000.0, name)
     
 
 
+@functools.lru_cache(maxsize=32)
+def _pdf_page_physical_size_cached(pdf_path: str, mtime: float, page_num: int):
+    # mtime is part of the cache key only, so edited files are inspected again
+    return get_pdf_page_physical_size(pdf_path, page_num)
+
+
+def get_pdf_page_physical_size_cached(pdf_path: str, page_num: int = 0):
+    """Like get_pdf_page_physical_size, but remember results per (path, modification time, page)."""
+    pdf_path = str(pdf_path)
+    return _pdf_page_physical_size_cached(pdf_path, os.path.getmtime(pdf_path), page_num)
+
+
 def pdf_page_to_pixmap(pdf_path: str, page_num: int, dpi: int = 300) -> bytes:
     """Convert a PDF page to a PNG image at the specified DPI.
     
@@ -118,15 +159,62 @@ def pdf_page_to_pixmap(pdf_path: str, page_num: int, dpi: int = 300) -> bytes:
         PNG image data as bytes
     """
     zoom = dpi / 72  # standard PDF dpi
-    doc = fitz.open(pdf_path)
+    page = _open(pdf_path).load_page(page_num)
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+
+    # Convert pixmap to PNG bytes
+    return pix.tobytes("png")
+
+
+# PNG renders by (path, modification time, page, dpi), most recently used last
+_RENDER_CACHE: "OrderedDict[tuple, bytes]" = OrderedDict()
+_RENDER_CACHE_SIZE = 4
+
+
+def _render_key(pdf_path: str, page_num: int, dpi: int) -> tuple:
+    # mtime is part of the key, so edited files are rendered again
+    return (pdf_path, os.path.getmtime(pdf_path), page_num, dpi)
+
+
+def _remember_render(key: tuple, png_data: bytes):
+    _RENDER_CACHE[key] = png_data
+    _RENDER_CACHE.move_to_end(key)
+    while len(_RENDER_CACHE) > _RENDER_CACHE_SIZE:
+        _RENDER_CACHE.popitem(last=False)
+
+
+def pdf_page_to_pixmap_cached(pdf_path: str, page_num: int, dpi: int = 300) -> bytes:
+    """Like pdf_page_to_pixmap, but reuse the last few renders.
+
+    Renders are keyed by (path, modification time, page, dpi), so switching
+    back to a page or reopening the same PDF skips the rasterization while a
+    changed file is always rendered again.
+    """
+    pdf_path = str(pdf_path)
+    key = _render_key(pdf_path, page_num, dpi)
+    png_data = _RENDER_CACHE.get(key)
+    if png_data is None:
+        png_data = pdf_page_to_pixmap(pdf_path, page_num, dpi)
+    _remember_render(key, png_data)
+    return png_data
+
+
+def store_pixmap_cached(pdf_path: str, page_num: int, png_data: bytes, dpi: int = 300):
+    """Add a render made elsewhere (e.g. in a worker process) to the pdf_page_to_pixmap_cached cache."""
+    pdf_path = str(pdf_path)
+    _remember_render(_render_key(pdf_path, page_num, dpi), png_data)
+
+
+def pdf_page_to_pixmap_detached(pdf_path: str, page_num: int, dpi: int = 300) -> bytes:
+    """Render like pdf_page_to_pixmap, then close the document again.
+
+    Meant for long-lived worker processes, which would otherwise keep the
+    file open between jobs.
+    """
     try:
-        page = doc.load_page(page_num)
-        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
-        
-        # Convert pixmap to PNG bytes
-        return pix.tobytes("png")
+        return pdf_page_to_pixmap(pdf_path, page_num, dpi)
     finally:
-        doc.close()
+        close_cached()
 
 
 def create_preview_image(pdf_path: str, page_num: int, target_width: int = 800) -> bytes:
@@ -140,20 +228,9 @@ def create_preview_image(pdf_path: str, page_num: int, target_width: int = 800)
     Returns:
         PNG image data as bytes
     """
-    # First get a medium resolution version
-    png_data = pdf_page_to_pixmap(pdf_path, page_num, dpi=150)
-    
-    # Load into PIL for resizing
-    img = Image.open(io.BytesIO(png_data))
-    
-    # Calculate height to maintain aspect ratio
-    aspect = img.height / img.width
-    target_height = int(target_width * aspect)
-    
-    # Resize 
-    img = img.resize((target_width, target_height), Image.Resampling.LANCZOS)
-    
-    # Convert back to PNG bytes
-    buf = io.BytesIO()
-    img.save(buf, format='PNG')
-    return buf.getvalue()
\ No newline at end of file
+    # Render straight at the preview size: rendering at 150 DPI, then
+    # decoding, resampling and re-encoding with PIL only made it slower
+    page = _open(pdf_path).load_page(page_num)
+    zoom = target_width / page.rect.width
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    return pix.tobytes("png")
@@ -121,6 +121,7 @@ class DetectorDialog(QDialog):
             # Update colors (unique serial numbers -> green) and ranges
             try:
                 if self.controller is not None:
+                    self.controller.invalidate_search_cache(self.detector)
                     self.controller.update_detector_colors()
                     try:
                         # update visibility of ranges if controller tracks that
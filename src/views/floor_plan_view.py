@@ -92,6 +92,17 @@ class FloorPlanView(QGraphicsView):
         except Exception:
             pass
 
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        # The scale legend is drawn in viewport coordinates, so a scrolled
+        # (partially updated) viewport would smear it; repaint when shown.
+        try:
+            ctr = getattr(self, 'controller', None)
+            if ctr and getattr(ctr, 'show_scale_legend', False):
+                self.viewport().update()
+        except Exception:
+            pass
+
     def mousePressEvent(self, event):
         """Handle mouse press events for adding detectors and panning.
 
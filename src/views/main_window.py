@@ -3,8 +3,73 @@ from PyQt6.QtGui import QAction, QIcon, QPixmap
 from PyQt6.QtCore import Qt, QSize
 from controllers.floor_plan_controller import FloorPlanController
 import json
+import zipfile
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _project_dumps(data):
+    """Serialize project data to UTF-8 JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            # e.g. non-string keys, which the json module accepts
+            pass
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+def _project_loads(raw):
+    """Parse project JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Project files are zip containers: the JSON document plus the floor plan image
+# as a raw entry, so neither save nor load has to base64 the image. Older
+# projects are plain JSON with the image embedded and are still read.
+PROJECT_JSON_ENTRY = 'project.json'
+
+
+def _floorplan_entry_name(blob):
+    """Return the container entry name for floor plan bytes, by file signature."""
+    if blob[:3] == b'\xff\xd8\xff':
+        return 'floorplan.jpg'
+    return 'floorplan.png'
+
+
+def write_project_file(path, data, blob=None):
+    """Write project `data` and optional floor plan bytes `blob` to `path`.
+
+    `data` is not modified.
+    """
+    data = dict(data)
+    with zipfile.ZipFile(path, 'w') as zf:
+        if blob:
+            data['floorplan_entry'] = _floorplan_entry_name(blob)
+            # Images are already compressed: store them as-is
+            zf.writestr(data['floorplan_entry'], blob, compress_type=zipfile.ZIP_STORED)
+        zf.writestr(PROJECT_JSON_ENTRY, _project_dumps(data), compress_type=zipfile.ZIP_DEFLATED)
+
+
+def read_project_file(path):
+    """Read a project file; returns (data, blob), blob None if not stored separately."""
+    path = Path(path)
+    if not zipfile.is_zipfile(path):
+        # Legacy project: plain JSON, image (if any) base64-embedded
+        return _project_loads(path.read_bytes()), None
+    with zipfile.ZipFile(path) as zf:
+        data = _project_loads(zf.read(PROJECT_JSON_ENTRY))
+        entry = data.get('floorplan_entry')
+        blob = zf.read(entry) if entry else None
+    return data, blob
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -481,10 +546,13 @@ class MainWindow(QMainWindow):
                 QMessageBox.information(self, "Cancelled", "PDF page selection was cancelled.")
                 return
             pdf_page = dialog.get_selected_page()
+            # Rasterize the page while the scale is being entered
+            self.floor_plan_controller.prefetch_pdf_page(image_path, pdf_page)
 
         # Ask for drawing scale (accepts formats like "1:100" or a numeric value)
         scale_text, ok = QInputDialog.getText(self, "Drawing Scale", "Enter drawing scale (e.g. 1:100) or meters-per-pixel (numeric):")
         if not ok:
+            self.floor_plan_controller.cancel_pdf_prefetch()
             return
 
         # Save project meta locally on the window instance for now
@@ -515,10 +583,9 @@ class MainWindow(QMainWindow):
         )
         if file_name:
             try:
-                with open(file_name, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data, blob = read_project_file(file_name)
                 # give the controller the data
-                self.floor_plan_controller.from_dict(data)
+                self.floor_plan_controller.from_dict(data, blob)
                 # set local metadata if present
                 self.project_name = data.get('project_name', Path(file_name).stem)
                 self.project_floorplan = data.get('floorplan_path')
@@ -541,15 +608,14 @@ class MainWindow(QMainWindow):
                 p = p.with_suffix('.sdp')
 
             try:
-                data = self.floor_plan_controller.to_dict()
+                data = self.floor_plan_controller.to_dict(embed_blob=False)
                 # include some top-level metadata
                 data['project_name'] = getattr(self, 'project_name', p.stem)
                 # ensure floorplan_path reflects what the controller has, if any
                 if hasattr(self.floor_plan_controller, 'floorplan_path'):
                     data['floorplan_path'] = str(self.floor_plan_controller.floorplan_path)
 
-                with open(p, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
+                write_project_file(p, data, self.floor_plan_controller.floorplan_blob_for_save())
 
                 QMessageBox.information(self, "Saved", f"Project saved to: {p}")
             except Exception as e:
@@ -29,7 +29,7 @@ class PDFPageSelector(QDialog):
         self.pdf_path = str(Path(pdf_path))
         
         # Get PDF info
-        self.page_count, self.page_dims = pdf_tools.get_pdf_info(self.pdf_path)
+        self.page_count, self.page_dims, self.page_papers = pdf_tools.get_pdf_info(self.pdf_path)
         
         # Create and load UI
         self._init_ui()
@@ -46,8 +46,9 @@ class PDFPageSelector(QDialog):
         page_layout = QHBoxLayout()
         page_layout.addWidget(QLabel("Page:"))
         self.page_combo = QComboBox()
-        self.page_combo.addItems([f"Page {i+1} ({w}x{h}px)" 
-                                for i, (w,h) in enumerate(self.page_dims)])
+        self.page_combo.addItems([f"Page {i+1} ({w}x{h}px)" if paper == "Unknown"
+                                  else f"Page {i+1} ({w}x{h}px, {paper})"
+                                  for i, ((w, h), paper) in enumerate(zip(self.page_dims, self.page_papers))])
         self.page_combo.currentIndexChanged.connect(self._load_preview)
         page_layout.addWidget(self.page_combo)
         page_layout.addStretch()
@@ -94,6 +95,11 @@ class PDFPageSelector(QDialog):
         except Exception as e:
             self.preview_label.setText(f"Error loading preview: {e}")
     
+    def done(self, result):
+        """Close the dialog and release the PDF file handles opened for the previews."""
+        pdf_tools.close_cached()
+        super().done(result)
+
     def get_selected_page(self) -> int:
         """Get the currently selected page number (0-based)."""
         return self.page_combo.currentIndex()
\ No newline at end of file
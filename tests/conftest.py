@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def window(qapp, monkeypatch, tmp_path):
+    """A main window with a plain floor plan loaded; message boxes never block."""
+    from PyQt6.QtGui import QColor, QImage
+    from PyQt6.QtWidgets import QMessageBox
+    from views.main_window import MainWindow
+
+    for name in ("information", "warning", "critical"):
+        monkeypatch.setattr(QMessageBox, name, staticmethod(lambda *a, **k: None))
+    w = MainWindow()
+    w.project_name = "Test project"
+    img = QImage(800, 600, QImage.Format.Format_RGB32)
+    img.fill(QColor(200, 220, 255))
+    plan = str(tmp_path / "plan.png")
+    img.save(plan)
+    w.floor_plan_controller.load_floor_plan(plan)
+    w.floor_plan_controller.set_scale(0.01)
+    yield w
+    w.close()
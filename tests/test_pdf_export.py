@@ -0,0 +1,54 @@
+import pytest
+from PyQt6.QtCore import QPointF
+
+from utils import pdf_export
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("pypdf")
+
+
+def _add_detectors(controller, buses=3, per_bus=60):
+    # 0.05 m per pixel keeps the grid clear of the minimum-spacing check
+    controller.set_scale(0.05)
+    for i in range(buses * per_bus):
+        d = controller.add_detector(QPointF(10 + (i % 20) * 35, 10 + (i // 20) * 30))
+        d.serial_number = f"SN{i:04d}"
+        d.bus_number = str(1 + i % buses)
+        d.group = "1"
+        d.address = str(i // buses + 1)
+        d.room_id = f"R{i}"
+
+
+def _footers(path):
+    """Return the sorted text lines of each page's bottom 2 cm."""
+    with fitz.open(path) as doc:
+        return [sorted(page.get_text(clip=fitz.Rect(0, page.rect.height - 57, page.rect.width, page.rect.height)).split("\n")[:-1])
+                for page in doc]
+
+
+def test_parallel_build_matches_serial(window, monkeypatch, tmp_path):
+    controller = window.floor_plan_controller
+    _add_detectors(controller)
+
+    serial = tmp_path / "serial.pdf"
+    controller.export_to_pdf(str(serial))
+
+    built = []
+    build_parallel = pdf_export.build_parallel
+
+    def spy(*args):
+        built.append(build_parallel(*args))
+        return built[-1]
+
+    monkeypatch.setattr(pdf_export, "PARALLEL_MIN_ROWS", 1)
+    monkeypatch.setattr(pdf_export, "build_parallel", spy)
+    # build_parallel falls back to the serial build on single-CPU machines
+    monkeypatch.setattr(pdf_export.os, "cpu_count", lambda: 2)
+    parallel = tmp_path / "parallel.pdf"
+    controller.export_to_pdf(str(parallel))
+    assert built == [True]
+
+    serial_footers = _footers(serial)
+    assert len(serial_footers) > 3
+    assert _footers(parallel) == serial_footers
+    assert serial_footers[-1] == [f"Page {len(serial_footers)}", "Test project"]
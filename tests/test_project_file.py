@@ -0,0 +1,85 @@
+import json
+import zipfile
+
+import pytest
+from PyQt6.QtCore import QPointF
+
+from controllers import floor_plan_controller
+from views.main_window import MainWindow, read_project_file, write_project_file
+
+
+@pytest.fixture
+def project(window):
+    """A controller with a few detectors and a line between the first two."""
+    controller = window.floor_plan_controller
+    for i in range(5):
+        d = controller.add_detector(QPointF(100 + i * 100, 200))
+        d.serial_number = f"SN{i:04d}"
+        d.bus_number = "1"
+        d.group = "2"
+        d.address = str(i + 1)
+        d.room_id = f"R{i}"
+    controller.add_line(controller.detectors[0], controller.detectors[1])
+    return controller
+
+
+def _detectors(controller):
+    return [(d.pos().x(), d.pos().y(), d.serial_number, d.get_full_address_label(), d.room_id)
+            for d in controller.detectors]
+
+
+def _reload(data, blob):
+    loaded = MainWindow().floor_plan_controller
+    loaded.from_dict(data, blob)
+    return loaded
+
+
+def test_zip_project_round_trip(project, tmp_path):
+    data = project.to_dict(embed_blob=False)
+    path = tmp_path / "project.sdp"
+    write_project_file(path, data, project.floorplan_blob_for_save())
+
+    assert 'floorplan_entry' not in data
+    with zipfile.ZipFile(path) as zf:
+        assert sorted(zf.namelist()) == ['floorplan.png', 'project.json']
+
+    data2, blob = read_project_file(path)
+    assert blob == project.floorplan_blob
+    loaded = _reload(data2, blob)
+    assert loaded.floorplan_blob == project.floorplan_blob
+    assert loaded.floor_plan_item is not None
+    assert _detectors(loaded) == _detectors(project)
+    assert loaded.to_dict(embed_blob=False)['lines'] == [[0, 1]]
+
+
+def test_legacy_json_project_loads(project, tmp_path):
+    path = tmp_path / "legacy.sdp"
+    path.write_text(json.dumps(project.to_dict(), indent=2), encoding='utf-8')
+
+    data, blob = read_project_file(path)
+    assert blob is None
+    loaded = _reload(data, blob)
+    assert loaded.floorplan_blob == project.floorplan_blob
+    assert loaded.floor_plan_item is not None
+    assert _detectors(loaded) == _detectors(project)
+    assert loaded.to_dict(embed_blob=False)['lines'] == [[0, 1]]
+
+
+def test_save_downscales_a_copy_of_a_large_floor_plan(project, monkeypatch, tmp_path):
+    monkeypatch.setattr(floor_plan_controller, "FLOORPLAN_BLOB_MAX_BYTES", 1000)
+    monkeypatch.setattr(floor_plan_controller, "FLOORPLAN_BLOB_MAX_EDGE", 400)
+    original = project.floorplan_blob
+
+    data = project.to_dict(embed_blob=False)
+    blob = project.floorplan_blob_for_save()
+    assert project.floorplan_blob is original
+    assert project.floorplan_blob_scale == 1.0
+    assert len(blob) < len(original)
+    assert data['floorplan_scale_hint'] == 2.0
+
+    path = tmp_path / "project.sdp"
+    write_project_file(path, data, blob)
+    loaded = _reload(*read_project_file(path))
+    assert loaded.floorplan_blob == blob
+    assert loaded.floor_plan_item.sceneBoundingRect() == project.floor_plan_item.sceneBoundingRect()
+    assert _detectors(loaded) == _detectors(project)